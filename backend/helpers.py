@@ -4,13 +4,29 @@
 uv run backend/template.py <url>
 """
 
+import asyncio
+import codecs
+import concurrent.futures
+import csv
+import hashlib
+import io
+import json
+import logging
 import os
+import re
 import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Generator, Hashable, Iterable, Iterator
 from dotenv import load_dotenv
 import argparse
 import psycopg2
+import psycopg2.pool
 from bs4 import BeautifulSoup
-import requests
+import httpx
+import orjson
 from pydantic import BaseModel
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -20,6 +36,15 @@ sys.path.append(ROOT)
 # load environment variables like PG_USER and PG_PASSWORD
 load_dotenv()
 
+# local modules read their settings from the environment at import time
+import snapshot_store
+from html_parsers import parse_title, soup_features
+from http_client import aclose_async_client, close_client, get_async_client, get_client
+from page_cache import fetch_head_async
+from yc_index import BatchIndex, CompanyIndex, CompanyStats, IdOrder, batch_slug
+
+logger = logging.getLogger(__name__)
+
 
 def print_roots():
     """ just for debug """
@@ -56,20 +81,14 @@ def db_create(DB_NAME: str = os.getenv("DB_NAME", "mcp")) -> None:
         raise Exception(f"Failed to create database: {e}")
 
 
-def db_connect(
-    db_name: str = os.getenv("DB_NAME", "mcp")
-) -> psycopg2.extensions.connection | None:
+def db_ensure_exists(db_name: str = os.getenv("DB_NAME", "mcp")) -> None:
     """
-    postgres db connection
-    create the db if it doesn't exist already, and connect to it
-    otherwise connect to the existing db right away
+    check pg_database for *db_name* and create it when missing
     """
     # brew services start postgresql
     # psql -U ${whoami} -d postgres
     # psql -U sudo -d postgres
     # CREATE DATABASE mcp;
-
-    # check if database exists
     try:
         conn = psycopg2.connect(
             host="localhost",
@@ -79,36 +98,202 @@ def db_connect(
             password=os.getenv("PG_PASSWORD"),
         )
         cursor = conn.cursor()
-        cursor.execute(f"SELECT 1 FROM pg_database WHERE datname = '{db_name}'")
+        cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s", (db_name,))
         exists = cursor.fetchone()
         conn.close()
 
     except Exception as e:
         raise Exception(f"Failed to check database existence: {e}")
 
-    if exists:
-        # connect to existing db
-        conn = psycopg2.connect(
-            host="localhost",
-            port=5432,
-            database=db_name,
-            user=os.getenv("PG_USER"),
-            password=os.getenv("PG_PASSWORD"),
-        )
-    else:
-        # create db and connect
+    if not exists:
         db_create(db_name)
-        conn = db_connect(db_name)
 
-    return conn
+
+def db_connect(
+    db_name: str = os.getenv("DB_NAME", "mcp")
+) -> psycopg2.extensions.connection | None:
+    """
+    postgres db connection
+    create the db if it doesn't exist already, and connect to it
+    otherwise connect to the existing db right away
+
+    Long-running processes should use the pool (`db_pool_open`,
+    `db_checkout`) instead of paying this handshake per call.
+    """
+    db_ensure_exists(db_name)
+    return psycopg2.connect(
+        host="localhost",
+        port=5432,
+        database=db_name,
+        user=os.getenv("PG_USER"),
+        password=os.getenv("PG_PASSWORD"),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Connection pool
+# ---------------------------------------------------------------------------
+
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+# seconds a checkout waits for a free connection once all are in use
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+
+class BlockingConnectionPool(psycopg2.pool.ThreadedConnectionPool):
+    """`ThreadedConnectionPool` whose `getconn` waits for a free connection.
+
+    The stock pool raises `PoolError` as soon as *maxconn* connections are
+    checked out; here callers queue for up to *timeout* seconds instead.
+    """
+
+    def __init__(self, minconn: int, maxconn: int, *args, timeout: float = DB_POOL_TIMEOUT, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(maxconn)
+
+    def getconn(self, key=None):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise psycopg2.pool.PoolError(
+                f"no database connection free after {self.timeout:g}s"
+            )
+        try:
+            return super().getconn(key)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn, key=None, close=False):
+        super().putconn(conn, key, close)
+        self._slots.release()
+
+
+_db_pool: BlockingConnectionPool | None = None
+_db_pool_lock = threading.Lock()
+
+
+def db_pool_open(
+    db_name: str = os.getenv("DB_NAME", "mcp"),
+    minconn: int = DB_POOL_MIN,
+    maxconn: int = DB_POOL_MAX,
+) -> BlockingConnectionPool:
+    """Create the process-wide connection pool (once) and return it.
+
+    The database-existence check runs here, not per connection.
+    """
+    global _db_pool
+    with _db_pool_lock:
+        if _db_pool is None:
+            db_ensure_exists(db_name)
+            _db_pool = BlockingConnectionPool(
+                minconn,
+                maxconn,
+                host="localhost",
+                port=5432,
+                database=db_name,
+                user=os.getenv("PG_USER"),
+                password=os.getenv("PG_PASSWORD"),
+            )
+        return _db_pool
+
+
+def db_pool_close() -> None:
+    """Close every pooled connection."""
+    global _db_pool
+    with _db_pool_lock:
+        if _db_pool is not None:
+            _db_pool.closeall()
+            _db_pool = None
+
+
+def _db_healthy(conn: psycopg2.extensions.connection) -> bool:
+    """Cheap liveness probe for a pooled connection."""
+    if conn.closed:
+        return False
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+
+def db_checkout() -> psycopg2.extensions.connection:
+    """Take a healthy connection from the pool, opening the pool if needed.
+
+    When every connection is in use this waits up to `DB_POOL_TIMEOUT`
+    seconds for one to be checked in, then raises `PoolError`.
+    """
+    pool = _db_pool or db_pool_open()
+    for _ in range(pool.maxconn + 1):
+        conn = pool.getconn()
+        if _db_healthy(conn):
+            return conn
+        pool.putconn(conn, close=True)
+    raise Exception("No healthy database connection available")
+
+
+def db_checkin(conn: psycopg2.extensions.connection) -> None:
+    """Return *conn* to the pool, discarding it if it is broken."""
+    pool = _db_pool
+    if pool is None:
+        conn.close()
+        return
+    broken = bool(conn.closed)
+    if not broken and conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+        try:
+            conn.rollback()
+        except psycopg2.Error:
+            broken = True
+    pool.putconn(conn, close=broken)
+
+
+@contextmanager
+def db_pooled_connection() -> Iterator[psycopg2.extensions.connection]:
+    """Context manager around `db_checkout` / `db_checkin`."""
+    conn = db_checkout()
+    try:
+        yield conn
+    finally:
+        db_checkin(conn)
 
 
-def fetch_url(url: str) -> BeautifulSoup:
+def fetch_url(url: str, parser: str | None = None) -> BeautifulSoup:
     """
     fetch the url and return the soup object
+
+    *parser* picks the tree builder (see `html_parsers.soup_features`);
+    by default the fastest installed one.
+    """
+    response = get_client().get(url)
+    return BeautifulSoup(response.text, soup_features(parser))
+
+
+# bytes of a page read at most when only its <head> is needed
+SCRAPE_MAX_BYTES = int(os.getenv("SCRAPE_MAX_BYTES", str(256 * 1024)))
+# the title cannot appear after any of these
+_HEAD_END = re.compile(rb"</title\s*>|</head\s*>|<body[\s>]", re.IGNORECASE)
+
+
+async def fetch_title_async(
+    url: str,
+    parser: str | None = None,
+    max_bytes: int | None = None,
+    timeout: float = 10,
+) -> str | None:
+    """
+    return the <title> of the url, reading as little of the page as possible
+
+    The body is streamed and abandoned as soon as `</title>`, `</head>` or
+    `<body` has arrived, or once *max_bytes* (default `SCRAPE_MAX_BYTES`)
+    have been read, so heavy pages cost a few kilobytes. The head goes through
+    the page cache, so a repeat call for an unchanged page is at most a 304.
+    Non-2xx responses raise `httpx.HTTPStatusError`.
     """
-    response = requests.get(url)
-    return BeautifulSoup(response.text, "html.parser")
+    budget = SCRAPE_MAX_BYTES if max_bytes is None else max_bytes
+    page = await fetch_head_async(url, _HEAD_END, budget, timeout=timeout)
+    return page.derive(("title", parser), lambda: parse_title(page.text, parser))
 
 
 def parse_url(url: str) -> None:
@@ -130,6 +315,610 @@ YC_CATEGORIES: dict[str, str] = {
 }
 
 
+# seconds a fetched snapshot is served without asking the upstream again
+YC_CACHE_TTL = float(os.getenv("YC_CACHE_TTL", "300"))
+# serve only the stored snapshot, never contact the upstream
+YC_OFFLINE = os.getenv("YC_OFFLINE", "").lower() in ("1", "true", "yes")
+# rows buffered per COPY round-trip by sync_companies
+YC_COPY_BATCH = int(os.getenv("YC_COPY_BATCH", "5000"))
+# bytes read from the upstream per streamed chunk
+YC_STREAM_CHUNK = 64 * 1024
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the work; callers arriving while it is
+    in flight, from other threads or asyncio tasks, wait for it and share
+    its result or exception. Nothing is kept once the call completes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key -> (shared future, id of the thread running the work)
+        self._flights: dict[Hashable, tuple[concurrent.futures.Future, int]] = {}
+
+    def _join(self, key: Hashable) -> tuple[concurrent.futures.Future, int, bool]:
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight[0], flight[1], False
+            future: concurrent.futures.Future = concurrent.futures.Future()
+            self._flights[key] = (future, threading.get_ident())
+            return future, threading.get_ident(), True
+
+    def _land(self, key: Hashable, future: concurrent.futures.Future) -> None:
+        with self._lock:
+            if key in self._flights and self._flights[key][0] is future:
+                del self._flights[key]
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Return ``fn()``, or the result of the call already running for *key*."""
+        while True:
+            future, owner, leader = self._join(key)
+            if leader:
+                try:
+                    result = fn()
+                except BaseException as exc:
+                    future.set_exception(exc)
+                    raise
+                finally:
+                    self._land(key, future)
+                future.set_result(result)
+                return result
+            if owner == threading.get_ident():
+                # led by a task on this thread's own event loop: blocking would deadlock it
+                return fn()
+            try:
+                return future.result()
+            except concurrent.futures.CancelledError:
+                continue  # the leading task was cancelled; take over
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Async `do`: await ``fn()`` or share the call already running for *key*."""
+        while True:
+            future, _owner, leader = self._join(key)
+            if leader:
+                try:
+                    result = await fn()
+                except asyncio.CancelledError:
+                    future.cancel()
+                    raise
+                except BaseException as exc:
+                    future.set_exception(exc)
+                    raise
+                finally:
+                    self._land(key, future)
+                future.set_result(result)
+                return result
+            try:
+                # shielded so a cancelled waiter does not cancel the shared call
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+
+# one upstream fetch per category, and one build per derived structure, at a time
+_yc_fetches = SingleFlight()
+_yc_derivations = SingleFlight()
+
+
+@dataclass
+class YCSnapshot:
+    """One fetched copy of a YC category feed plus its validators.
+
+    `version` is a short content hash of the raw body; it only changes when the
+    upstream data changes, so derived structures (indexes, stats) can be keyed
+    on it. `companies` is shared by every caller and must not be mutated.
+    """
+
+    category: str
+    url: str
+    companies: list[dict]
+    version: str
+    etag: str | None = None
+    last_modified: str | None = None
+    fetched_at: float = field(default_factory=time.time)
+    checked_at: float = field(default_factory=time.monotonic)
+    derived: dict[str, Any] = field(default_factory=dict, repr=False)
+
+    def derive(self, name: str, build: Callable[[list[dict]], Any]) -> Any:
+        """Return the structure *name* built from this snapshot, building it once.
+
+        A new upstream version produces a new snapshot object, so anything
+        cached here is dropped together with the data it was built from.
+        """
+        value = self.derived.get(name)
+        if value is None:
+            value = _yc_derivations.do((id(self), name), lambda: self._build(name, build))
+        return value
+
+    def _build(self, name: str, build: Callable[[list[dict]], Any]) -> Any:
+        value = self.derived.get(name)
+        if value is None:
+            value = build(self.companies)
+            self.derived[name] = value
+        return value
+
+    def is_fresh(self, ttl: float) -> bool:
+        """True if the snapshot was validated less than *ttl* seconds ago."""
+        return time.monotonic() - self.checked_at < ttl
+
+
+_yc_snapshots: dict[str, YCSnapshot] = {}
+_yc_snapshots_lock = threading.Lock()
+
+
+def _yc_category_url(category: str) -> tuple[str, str]:
+    """Return (normalized key, url) for *category* or raise ValueError."""
+    key = category.lower()
+    endpoint = YC_CATEGORIES.get(key)
+    if endpoint is None:
+        raise ValueError(
+            f"Unsupported category '{category}'. Allowed: {', '.join(YC_CATEGORIES)}"
+        )
+    return key, f"{YC_API_BASE}/{endpoint}"
+
+
+# characters that can continue a number which already decodes
+_NUMBER_TAIL = frozenset("0123456789.eE+-")
+
+
+class JSONArrayParser:
+    """Incremental decoder for the elements of a top-level JSON array.
+
+    Feed it raw byte chunks as they arrive; only the current element (plus
+    one undecoded chunk) is held at a time, so memory stays flat however
+    long the array is.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8-sig")()
+        self._buf = ""
+        self._pos = 0
+        self._started = False
+        self.done = False
+
+    def feed(self, chunk: bytes) -> Iterator[Any]:
+        """Yield every element completed by *chunk*."""
+        buf = self._buf[self._pos:] + self._text.decode(chunk)
+        pos = 0
+        while not self.done:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buf):
+                break
+            if not self._started:
+                if buf[pos] != "[":
+                    raise ValueError("Expected a JSON array")
+                self._started = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                self.done = True
+                break
+            try:
+                item, end = self._decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break  # element continues in the next chunk
+            # a number can decode from a cut-off prefix ("2." of "2.5"), so an
+            # element only counts once the `,` or `]` after it has arrived
+            after = end
+            while after < len(buf) and buf[after] in " \t\r\n":
+                after += 1
+            if after >= len(buf) or buf[after] in _NUMBER_TAIL:
+                break
+            if buf[after] not in ",]":
+                raise ValueError(f"Unexpected {buf[after]!r} after a JSON array element")
+            yield item
+            pos = end
+        self._buf, self._pos = buf, pos
+
+    def close(self) -> None:
+        """Raise if the array was not terminated."""
+        if not self.done:
+            raise ValueError("Truncated JSON array")
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array as its bytes arrive."""
+    parser = JSONArrayParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.done:
+            return
+    parser.close()
+
+
+def _revalidation_headers(cached: YCSnapshot | None) -> dict[str, str]:
+    """Conditional-request headers for refreshing *cached*."""
+    headers: dict[str, str] = {}
+    if cached is not None:
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+    return headers
+
+
+def _new_yc_snapshot(
+    key: str,
+    url: str,
+    cached: YCSnapshot | None,
+    companies: list[dict],
+    version: str,
+    headers,
+) -> YCSnapshot:
+    """Build the snapshot for a 200 response, reusing *cached* if unchanged."""
+    if cached is not None and cached.version == version:
+        # server ignored our validators but the body is identical
+        cached.etag = headers.get("ETag", cached.etag)
+        cached.last_modified = headers.get("Last-Modified", cached.last_modified)
+        cached.checked_at = time.monotonic()
+        return cached
+
+    return YCSnapshot(
+        category=key,
+        url=url,
+        companies=companies,
+        version=version,
+        etag=headers.get("ETag"),
+        last_modified=headers.get("Last-Modified"),
+    )
+
+
+class _YCFeed:
+    """Companies of an upstream fetch in progress, readable while it downloads."""
+
+    def __init__(self):
+        self.companies: list[dict] = []
+        # set once every company of the new snapshot has been appended
+        self.complete = False
+
+
+# category -> feed of the fetch currently downloading it
+_yc_feeds: dict[str, _YCFeed] = {}
+_yc_feeds_changed = threading.Condition()
+
+
+@contextmanager
+def _publish_yc_feed(key: str) -> Iterator[_YCFeed]:
+    """Expose the companies of the fetch of *key* to `_tail_yc_refresh`."""
+    feed = _YCFeed()
+    with _yc_feeds_changed:
+        _yc_feeds[key] = feed
+        _yc_feeds_changed.notify_all()
+    try:
+        yield feed
+    finally:
+        with _yc_feeds_changed:
+            if _yc_feeds.get(key) is feed:
+                del _yc_feeds[key]
+            _yc_feeds_changed.notify_all()
+
+
+def _feed_extend(feed: _YCFeed, companies: Iterable[dict]) -> None:
+    with _yc_feeds_changed:
+        feed.companies.extend(companies)
+        _yc_feeds_changed.notify_all()
+
+
+def _stream_yc_feed(
+    key: str,
+    url: str,
+    cached: YCSnapshot | None,
+    keep: bool = True,
+) -> Generator[dict, None, YCSnapshot | None]:
+    """Yield companies of *url* while downloading; return the new snapshot.
+
+    The feed is revalidated against *cached* when we have one; a 304 replays
+    the cached companies. With ``keep=False`` nothing is accumulated and the
+    return value is None.
+    """
+    headers = _revalidation_headers(cached)
+    with get_client().stream("GET", url, headers=headers) as response:
+        if cached is not None and response.status_code == 304:
+            cached.checked_at = time.monotonic()
+            yield from cached.companies
+            return cached
+        response.raise_for_status()
+
+        digest = hashlib.sha256()
+
+        def chunks() -> Iterator[bytes]:
+            for chunk in response.iter_bytes(YC_STREAM_CHUNK):
+                digest.update(chunk)
+                yield chunk
+
+        companies: list[dict] = []
+        for company in iter_json_array(chunks()):
+            if keep:
+                companies.append(company)
+            yield company
+
+    if not keep:
+        return None
+    return _new_yc_snapshot(key, url, cached, companies, digest.hexdigest()[:16], response.headers)
+
+
+async def _fetch_yc_snapshot_async(key: str, url: str, cached: YCSnapshot | None) -> YCSnapshot:
+    """Async twin of `_fetch_yc_snapshot` on the shared httpx client."""
+    client = get_async_client()
+    headers = _revalidation_headers(cached)
+    async with client.stream("GET", url, headers=headers) as response:
+        if cached is not None and response.status_code == 304:
+            cached.checked_at = time.monotonic()
+            return cached
+        response.raise_for_status()
+
+        digest = hashlib.sha256()
+        parser = JSONArrayParser()
+        with _publish_yc_feed(key) as feed:
+            async for chunk in response.aiter_bytes(YC_STREAM_CHUNK):
+                digest.update(chunk)
+                _feed_extend(feed, parser.feed(chunk))
+            parser.close()
+            feed.complete = True
+
+    return _new_yc_snapshot(key, url, cached, feed.companies, digest.hexdigest()[:16], response.headers)
+
+
+def _fetch_yc_snapshot(key: str, url: str, cached: YCSnapshot | None) -> YCSnapshot:
+    """Download *url* into a snapshot, revalidating against *cached*."""
+    stream = _stream_yc_feed(key, url, cached)
+    with _publish_yc_feed(key) as feed:
+        while True:
+            try:
+                company = next(stream)
+            except StopIteration as stop:
+                feed.complete = True
+                return stop.value
+            _feed_extend(feed, (company,))
+
+
+def _load_stored_snapshot(key: str, url: str) -> YCSnapshot | None:
+    """Rebuild a snapshot from the on-disk store, if one was saved."""
+    stored = snapshot_store.read(key)
+    if stored is None:
+        return None
+    companies, meta = stored
+    checked_wall = meta.get("checked_at") or meta.get("fetched_at") or 0.0
+    return YCSnapshot(
+        category=key,
+        url=url,
+        companies=companies,
+        version=meta["version"],
+        etag=meta.get("etag"),
+        last_modified=meta.get("last_modified"),
+        fetched_at=meta.get("fetched_at") or 0.0,
+        # carry the on-disk age over so a stale file is still revalidated
+        checked_at=time.monotonic() - max(0.0, time.time() - checked_wall),
+    )
+
+
+def _lookup_snapshot(key: str, url: str) -> YCSnapshot | None:
+    """In-memory snapshot for *key*, falling back to the on-disk store."""
+    with _yc_snapshots_lock:
+        cached = _yc_snapshots.get(key)
+    if cached is None:
+        stored = _load_stored_snapshot(key, url)
+        if stored is not None:
+            with _yc_snapshots_lock:
+                cached = _yc_snapshots.setdefault(key, stored)
+    return cached
+
+
+async def _lookup_snapshot_async(key: str, url: str) -> YCSnapshot | None:
+    """`_lookup_snapshot` that reads the on-disk store off the event loop."""
+    with _yc_snapshots_lock:
+        cached = _yc_snapshots.get(key)
+    if cached is not None:
+        return cached
+    return await asyncio.to_thread(_lookup_snapshot, key, url)
+
+
+def _serve_cached(cached: YCSnapshot | None, ttl: float) -> bool:
+    """True if *cached* can be returned without contacting the upstream."""
+    if cached is None:
+        if YC_OFFLINE:
+            raise RuntimeError("YC_OFFLINE is set and no stored snapshot is available")
+        return False
+    return YC_OFFLINE or cached.is_fresh(ttl)
+
+
+def _install_snapshot(snapshot: YCSnapshot, previous: YCSnapshot | None) -> None:
+    """Make *snapshot* current in memory and on disk."""
+    if previous is not None and snapshot is not previous and "stats" in previous.derived:
+        # carry the counts over by applying only what changed between versions
+        snapshot.derived["stats"] = previous.derived["stats"].updated(
+            previous.companies, snapshot.companies
+        )
+    with _yc_snapshots_lock:
+        _yc_snapshots[snapshot.category] = snapshot
+    meta = {
+        "version": snapshot.version,
+        "etag": snapshot.etag,
+        "last_modified": snapshot.last_modified,
+        "fetched_at": snapshot.fetched_at,
+        "checked_at": time.time(),
+    }
+    try:
+        if snapshot is previous:
+            snapshot_store.write_meta(snapshot.category, meta)
+        else:
+            snapshot_store.write(snapshot.category, snapshot.companies, meta)
+    except OSError as exc:
+        logger.warning("Could not store YC snapshot %s: %s", snapshot.category, exc)
+
+
+def _stale_fallback(cached: YCSnapshot | None, exc: Exception) -> YCSnapshot:
+    """Serve the last good snapshot when the upstream cannot be reached."""
+    if cached is None:
+        raise exc
+    logger.warning(
+        "YC upstream unavailable (%s); serving stored snapshot %s of '%s'",
+        exc, cached.version, cached.category,
+    )
+    return cached
+
+
+def _refresh_yc_snapshot(key: str, url: str, ttl: float) -> YCSnapshot:
+    """Fetch and install *key* unless a concurrent refresh just did."""
+    cached = _lookup_snapshot(key, url)
+    if _serve_cached(cached, ttl):
+        return cached
+
+    try:
+        snapshot = _fetch_yc_snapshot(key, url, cached)
+    except httpx.HTTPError as exc:
+        return _stale_fallback(cached, exc)
+    _install_snapshot(snapshot, cached)
+    return snapshot
+
+
+async def _refresh_yc_snapshot_async(key: str, url: str, ttl: float) -> YCSnapshot:
+    """Async `_refresh_yc_snapshot`; disk reads and writes run in a thread."""
+    cached = await _lookup_snapshot_async(key, url)
+    if _serve_cached(cached, ttl):
+        return cached
+
+    try:
+        snapshot = await _fetch_yc_snapshot_async(key, url, cached)
+    except httpx.HTTPError as exc:
+        return _stale_fallback(cached, exc)
+    await asyncio.to_thread(_install_snapshot, snapshot, cached)
+    return snapshot
+
+
+def get_yc_snapshot(category: str = "all", ttl: float | None = None) -> YCSnapshot:
+    """Return the cached snapshot for *category*, refreshing it once stale.
+
+    Within *ttl* seconds (default `YC_CACHE_TTL`) no request is made at all;
+    after that the upstream is revalidated with ETag / If-Modified-Since so an
+    unchanged feed only costs a 304. Snapshots are also kept on disk (see
+    `snapshot_store`): a fresh process starts from the stored copy, and if the
+    upstream is unreachable, or `YC_OFFLINE` is set, the stored copy is served.
+
+    Concurrent refreshes of one category, sync or async, share a single
+    download and parse.
+    """
+    key, url = _yc_category_url(category)
+    ttl = YC_CACHE_TTL if ttl is None else ttl
+
+    cached = _lookup_snapshot(key, url)
+    if _serve_cached(cached, ttl):
+        return cached
+    return _yc_fetches.do(key, lambda: _refresh_yc_snapshot(key, url, ttl))
+
+
+async def get_yc_snapshot_async(category: str = "all", ttl: float | None = None) -> YCSnapshot:
+    """Async `get_yc_snapshot`: same cache, fetched without blocking the loop."""
+    key, url = _yc_category_url(category)
+    ttl = YC_CACHE_TTL if ttl is None else ttl
+
+    cached = await _lookup_snapshot_async(key, url)
+    if _serve_cached(cached, ttl):
+        return cached
+    return await _yc_fetches.do_async(key, lambda: _refresh_yc_snapshot_async(key, url, ttl))
+
+
+def iter_yc_companies(category: str = "all", cache: bool = True) -> Iterator[dict]:
+    """Yield YC companies of *category* one at a time.
+
+    A fresh cached (or, offline, stored) snapshot is replayed directly.
+    Otherwise companies are yielded while the feed is still downloading.
+    With ``cache=True`` the download is the shared refresh of
+    `get_yc_snapshot`, so concurrent readers, streaming or not, cause a single
+    fetch, and its result becomes the cached snapshot. With ``cache=False``
+    this reader downloads on its own, nothing is retained and memory stays
+    flat. If the upstream cannot be reached, the stale snapshot is replayed
+    instead, as in `get_yc_snapshot`.
+    """
+    key, url = _yc_category_url(category)
+
+    cached = _lookup_snapshot(key, url)
+    if _serve_cached(cached, YC_CACHE_TTL):
+        yield from cached.companies
+        return
+    if cache:
+        yield from _tail_yc_refresh(key, category)
+        return
+
+    stream = _stream_yc_feed(key, url, cached, keep=False)
+    try:
+        first = next(stream)
+    except StopIteration:  # empty feed
+        return
+    except httpx.HTTPError as exc:
+        # nothing sent yet, so the stored copy can still stand in
+        yield from _stale_fallback(cached, exc).companies
+        return
+    yield first
+    yield from stream
+
+
+# runs the refreshes tailed by streaming readers, at most one per category
+_yc_refresher = concurrent.futures.ThreadPoolExecutor(
+    max_workers=len(YC_CATEGORIES), thread_name_prefix="yc-refresh"
+)
+_yc_background: dict[str, concurrent.futures.Future] = {}
+
+
+def _notify_yc_feeds(_future: concurrent.futures.Future) -> None:
+    with _yc_feeds_changed:
+        _yc_feeds_changed.notify_all()
+
+
+def _tail_yc_refresh(key: str, category: str) -> Iterator[dict]:
+    """Yield the companies of the shared refresh of *key* as they download.
+
+    The refresh runs in the background through `get_yc_snapshot`, starting
+    or joining the single flight for *key*, so it completes and is cached
+    however slowly this reader consumes; the companies are read from the
+    fetch's published feed.
+    """
+    with _yc_feeds_changed:
+        future = _yc_background.get(key)
+        if future is None or future.done():
+            future = _yc_refresher.submit(get_yc_snapshot, category)
+            future.add_done_callback(_notify_yc_feeds)
+            _yc_background[key] = future
+
+    feed: _YCFeed | None = None
+    sent = 0
+    while True:
+        with _yc_feeds_changed:
+            while True:
+                feed = feed or _yc_feeds.get(key)
+                if future.done() or (feed is not None and sent < len(feed.companies)):
+                    break
+                _yc_feeds_changed.wait()
+            batch = feed.companies[sent:] if feed is not None else []
+        yield from batch
+        sent += len(batch)
+        if future.done() and (feed is None or sent == len(feed.companies)):
+            break
+
+    snapshot = future.result()
+    if feed is not None and feed.complete:
+        return
+    if sent:
+        # the download broke off after part of it was sent; the stale copy cannot be spliced in
+        raise RuntimeError(f"YC feed '{key}' ended before it was complete")
+    yield from snapshot.companies
+
+
+def clear_yc_cache(category: str | None = None) -> None:
+    """Drop cached snapshots (all of them, or just *category*)."""
+    with _yc_snapshots_lock:
+        if category is None:
+            _yc_snapshots.clear()
+        else:
+            _yc_snapshots.pop(category.lower(), None)
+
+
 def get_yc_companies(
     category: str = "all",
 ) -> list[dict]:
@@ -140,24 +929,39 @@ def get_yc_companies(
         • top – YC "Top Companies" list
         • hiring – companies currently hiring
         • nonprofit – non-profit companies
+
+    The list comes from the shared snapshot cache (see `get_yc_snapshot`)
+    and must be treated as read-only.
     """
 
-    key = category.lower()
-    endpoint = YC_CATEGORIES.get(key)
-    if endpoint is None:
-        raise ValueError(
-            f"Unsupported category '{category}'. Allowed: {', '.join(YC_CATEGORIES)}"
-        )
+    return get_yc_snapshot(category).companies
+
+
+def get_yc_batch_index(category: str = "all") -> BatchIndex:
+    """Return the batch partition of the current *category* snapshot."""
+    return get_yc_snapshot(category).derive("batches", BatchIndex)
+
+
+def get_yc_company_index(category: str = "all") -> CompanyIndex:
+    """Return the filter index of the current *category* snapshot."""
+    snapshot = get_yc_snapshot(category)
+    batches = snapshot.derive("batches", BatchIndex)
+    return snapshot.derive("companies", lambda companies: CompanyIndex(companies, batches))
+
 
-    url = f"{YC_API_BASE}/{endpoint}"
-    response = requests.get(url, timeout=15)
-    response.raise_for_status()
-    return response.json()
+def get_yc_id_order(category: str = "all") -> IdOrder:
+    """Return the id-sorted view of the current *category* snapshot."""
+    return get_yc_snapshot(category).derive("by_id", IdOrder)
 
 
-def _normalize_batch(batch: str) -> str:
-    """Normalize batch name to standard format (e.g., 'Summer 2015' -> 'summer-2015')."""
-    return batch.lower().replace(" ", "-")
+async def get_yc_id_order_async(category: str = "all") -> IdOrder:
+    """Async `get_yc_id_order`."""
+    return (await get_yc_snapshot_async(category)).derive("by_id", IdOrder)
+
+
+def get_yc_stats(category: str = "all") -> CompanyStats:
+    """Return the group-by counts of the current *category* snapshot."""
+    return get_yc_snapshot(category).derive("stats", CompanyStats)
 
 
 def get_yc_batch_companies(batch: str) -> list[dict]:
@@ -165,15 +969,12 @@ def get_yc_batch_companies(batch: str) -> list[dict]:
     
     Args:
         batch: Batch name in human-readable format (e.g., 'Summer 2015')
+            or slug form (e.g., 'summer-2015')
         
     Returns:
         List of company dictionaries for the specified batch
     """
-    # Get all companies
-    all_companies = get_yc_companies("all")
-    
-    # Filter by batch
-    batch_companies = [company for company in all_companies if company.get("batch") == batch]
+    batch_companies = get_yc_batch_index().get(batch)
     
     if not batch_companies:
         raise ValueError(f"No companies found for batch '{batch}'")
@@ -181,6 +982,17 @@ def get_yc_batch_companies(batch: str) -> list[dict]:
     return batch_companies
 
 
+async def get_yc_batch_companies_async(batch: str) -> list[dict]:
+    """Async `get_yc_batch_companies`."""
+    snapshot = await get_yc_snapshot_async("all")
+    batch_companies = snapshot.derive("batches", BatchIndex).get(batch)
+
+    if not batch_companies:
+        raise ValueError(f"No companies found for batch '{batch}'")
+
+    return batch_companies
+
+
 # ---------------------------------------------------------------------------
 # Pydantic model & DB helpers
 # ---------------------------------------------------------------------------
@@ -200,6 +1012,12 @@ class YCCompany(BaseModel):
     stage: str | None = None
     isHiring: bool | None = None
     nonprofit: bool | None = None
+    status: str | None = None
+    long_description: str | None = None
+    team_size: int | None = None
+    industries: list[str] = []
+    regions: list[str] = []
+    tags: list[str] = []
 
     class Config:
         extra = "allow"
@@ -214,10 +1032,57 @@ class YCCompany(BaseModel):
             tags.append("nonprofit")
         return tags
 
+    def db_row(self, content_hash: str | None = None) -> tuple:
+        """Values in `COMPANY_COLUMNS` order."""
+        return (
+            self.id, self.name, self.slug, self.website, self.all_locations,
+            self.one_liner, self.industry, self.subindustry, self.batch,
+            self.stage, self.isHiring, self.nonprofit,
+            _pg_array(self.classification), content_hash,
+            self.status, self.long_description, self.team_size,
+            _pg_array(self.industries), _pg_array(self.regions), _pg_array(self.tags),
+        )
+
+
+# yc_companies columns written by the COPY merge, in COPY order
+COMPANY_COLUMNS: tuple[str, ...] = (
+    "id", "name", "slug", "website", "locations", "one_liner",
+    "industry", "subindustry", "batch", "stage",
+    "is_hiring", "nonprofit", "classification", "content_hash",
+    "status", "long_description", "team_size", "industries", "regions", "tags",
+)
+
+# position of the content hash in a `YCCompany.db_row`
+_HASH_COLUMN = COMPANY_COLUMNS.index("content_hash")
+
+# bump whenever COMPANY_COLUMNS changes so the next sync rewrites every row
+COMPANY_SCHEMA_VERSION = b"2"
+
+
+def company_hash(item: dict) -> str:
+    """Stable content hash of one raw company dict (key order independent)."""
+    digest = hashlib.sha1(COMPANY_SCHEMA_VERSION)
+    digest.update(orjson.dumps(item, option=orjson.OPT_SORT_KEYS))
+    return digest.hexdigest()
+
+
+def _pg_array(values: list[str]) -> str:
+    """Render *values* as a Postgres text[] literal for COPY."""
+    quoted = ('"' + v.replace("\\", "\\\\").replace('"', '\\"') + '"' for v in values)
+    return "{" + ",".join(quoted) + "}"
+
+
+_ensured_databases: set[str] = set()
+
 
 def ensure_companies_table(conn: psycopg2.extensions.connection) -> None:
-    """Create companies table if it doesn't exist."""
+    """Create companies table and its indexes if they don't exist.
+
+    The DDL runs once per database per process; later calls are a set lookup.
+    """
 
+    if conn.dsn in _ensured_databases:
+        return
     with conn.cursor() as cur:
         cur.execute(
             """
@@ -236,10 +1101,63 @@ def ensure_companies_table(conn: psycopg2.extensions.connection) -> None:
                 nonprofit BOOLEAN,
                 classification TEXT[]
             );
+            ALTER TABLE yc_companies
+                ADD COLUMN IF NOT EXISTS content_hash TEXT,
+                ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMPTZ,
+                ADD COLUMN IF NOT EXISTS status TEXT,
+                ADD COLUMN IF NOT EXISTS long_description TEXT,
+                ADD COLUMN IF NOT EXISTS team_size INTEGER,
+                ADD COLUMN IF NOT EXISTS industries TEXT[],
+                ADD COLUMN IF NOT EXISTS regions TEXT[],
+                ADD COLUMN IF NOT EXISTS tags TEXT[];
+
+            -- lowercased, newline-joined array text; IMMUTABLE so it can be indexed
+            CREATE OR REPLACE FUNCTION yc_array_text(TEXT[]) RETURNS TEXT
+                LANGUAGE sql IMMUTABLE PARALLEL SAFE
+                AS $$ SELECT lower(array_to_string($1, E'\\n')) $$;
+
+            CREATE INDEX IF NOT EXISTS yc_companies_batch_slug_idx
+                ON yc_companies (lower(replace(batch, ' ', '-')));
+            CREATE INDEX IF NOT EXISTS yc_companies_status_idx ON yc_companies (lower(status));
+            CREATE INDEX IF NOT EXISTS yc_companies_team_size_idx ON yc_companies (team_size);
+            -- array filters are substring matches served by the trigram
+            -- indexes below; plain array GIN indexes only slowed writes
+            DROP INDEX IF EXISTS yc_companies_industries_idx;
+            DROP INDEX IF EXISTS yc_companies_regions_idx;
+            DROP INDEX IF EXISTS yc_companies_tags_idx;
             """
         )
         conn.commit()
 
+        # substring filters use trigram indexes; needs the pg_trgm extension
+        try:
+            cur.execute(
+                """
+                CREATE EXTENSION IF NOT EXISTS pg_trgm;
+                CREATE INDEX IF NOT EXISTS yc_companies_name_trgm_idx
+                    ON yc_companies USING gin (lower(name) gin_trgm_ops);
+                CREATE INDEX IF NOT EXISTS yc_companies_one_liner_trgm_idx
+                    ON yc_companies USING gin (lower(one_liner) gin_trgm_ops);
+                CREATE INDEX IF NOT EXISTS yc_companies_description_trgm_idx
+                    ON yc_companies USING gin (lower(long_description) gin_trgm_ops);
+                CREATE INDEX IF NOT EXISTS yc_companies_status_trgm_idx
+                    ON yc_companies USING gin (lower(status) gin_trgm_ops);
+                CREATE INDEX IF NOT EXISTS yc_companies_industry_trgm_idx
+                    ON yc_companies USING gin (lower(industry) gin_trgm_ops);
+                CREATE INDEX IF NOT EXISTS yc_companies_industries_trgm_idx
+                    ON yc_companies USING gin (yc_array_text(industries) gin_trgm_ops);
+                CREATE INDEX IF NOT EXISTS yc_companies_regions_trgm_idx
+                    ON yc_companies USING gin (yc_array_text(regions) gin_trgm_ops);
+                CREATE INDEX IF NOT EXISTS yc_companies_tags_trgm_idx
+                    ON yc_companies USING gin (yc_array_text(tags) gin_trgm_ops);
+                """
+            )
+            conn.commit()
+        except psycopg2.Error as exc:
+            conn.rollback()
+            logger.warning("pg_trgm unavailable, text filters will scan: %s", exc)
+    _ensured_databases.add(conn.dsn)
+
 
 def upsert_company(conn: psycopg2.extensions.connection, company: YCCompany) -> None:
     """Insert or update a YCCompany row."""
@@ -281,19 +1199,148 @@ def upsert_company(conn: psycopg2.extensions.connection, company: YCCompany) ->
 
 def save_companies_to_db(
     conn: psycopg2.extensions.connection,
-    companies: list[dict],
+    companies: Iterable[dict],
 ) -> int:
-    """Persist list of raw dict companies to DB, return count."""
+    """Persist raw dict companies to DB, return count of rows written.
+
+    *companies* may be any iterable, e.g. `iter_yc_companies(cache=False)`,
+    so rows are written while the feed is still downloading. Rows whose
+    content hash is unchanged are skipped (see `sync_companies`).
+    """
+
+    stats = sync_companies(conn, companies, delete_missing=False)
+    return stats["added"] + stats["changed"]
+
+
+def _copy_rows(cur, rows: list[tuple]) -> None:
+    """COPY *rows* into the session's staging table."""
+    buf = io.StringIO()
+    # QUOTE_NOTNULL leaves None unquoted, which COPY's csv format reads as NULL
+    csv.writer(buf, quoting=csv.QUOTE_NOTNULL).writerows(rows)
+    buf.seek(0)
+    cur.copy_expert(
+        f"COPY yc_companies_stage ({', '.join(COMPANY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+        buf,
+    )
 
-    count = 0
+
+def _validated_rows(companies: Iterable[dict], failed: list) -> Iterator[tuple]:
+    """Yield DB rows for valid companies; append the ids of invalid ones to *failed*."""
     for item in companies:
         try:
-            model = YCCompany(**item)
-            upsert_company(conn, model)
-            count += 1
+            yield YCCompany(**item).db_row(company_hash(item))
         except Exception as exc:  # pylint: disable=broad-except
-            print(f"Failed to store id={item.get('id')}: {exc}")
-    return count
+            failed.append(item.get("id"))
+            logger.warning("Failed to store id=%s: %s", item.get("id"), exc)
+
+
+def _merge_staged(cur, rows: Iterable[tuple], batch_size: int) -> list[bool]:
+    """COPY *rows* into a staging table and merge them into `yc_companies`.
+
+    Returns one flag per merged row: True if it was inserted, False if an
+    existing row was updated. Nothing is staged when *rows* is empty.
+    """
+    staged = False
+    batch: list[tuple] = []
+
+    def flush() -> None:
+        nonlocal staged
+        if not staged:
+            cur.execute(
+                "CREATE TEMP TABLE yc_companies_stage (LIKE yc_companies) ON COMMIT DROP;"
+            )
+            staged = True
+        _copy_rows(cur, batch)
+        batch.clear()
+
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    if not staged:
+        return []
+
+    updates = ", ".join(f"{col} = EXCLUDED.{col}" for col in COMPANY_COLUMNS[1:])
+    # last occurrence of a duplicated id wins, like sequential upserts
+    cur.execute(
+        f"""
+        INSERT INTO yc_companies ({', '.join(COMPANY_COLUMNS)})
+        SELECT DISTINCT ON (id) {', '.join(COMPANY_COLUMNS)}
+        FROM yc_companies_stage
+        ORDER BY id, ctid DESC
+        ON CONFLICT (id) DO UPDATE SET {updates}, deleted_at = NULL
+        RETURNING (xmax = 0);
+        """
+    )
+    return [row[0] for row in cur.fetchall()]
+
+
+def sync_companies(
+    conn: psycopg2.extensions.connection,
+    companies: Iterable[dict],
+    delete_missing: bool = True,
+    batch_size: int = YC_COPY_BATCH,
+) -> dict[str, int]:
+    """Bring `yc_companies` in line with *companies*, touching only what changed.
+
+    Each company's content hash is compared with the stored one: new and
+    changed rows go through the COPY merge, unchanged rows are skipped. With
+    *delete_missing* (only meaningful when *companies* is the full "all"
+    list) stored rows absent from the feed are soft-deleted by setting
+    `deleted_at`; rows of companies that fail validation are left as they
+    are. Returns ``{"added", "changed", "removed", "unchanged",
+    "failed"}`` counts.
+    """
+
+    ensure_companies_table(conn)
+    failed: list = []
+    counts = {"added": 0, "changed": 0, "unchanged": 0}
+    seen: set[int] = set()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT id, content_hash, deleted_at IS NOT NULL FROM yc_companies;")
+            stored = {row[0]: (row[1], row[2]) for row in cur.fetchall()}
+
+            def pending() -> Iterator[tuple]:
+                for row in _validated_rows(companies, failed):
+                    cid, content_hash = row[0], row[_HASH_COLUMN]
+                    if cid in seen:
+                        continue
+                    seen.add(cid)
+                    previous = stored.get(cid)
+                    if previous is None:
+                        counts["added"] += 1
+                    elif previous[0] != content_hash or previous[1]:
+                        counts["changed"] += 1
+                    else:
+                        counts["unchanged"] += 1
+                        continue
+                    yield row
+
+            _merge_staged(cur, pending(), batch_size)
+
+            removed: list[int] = []
+            # a company that fails validation is still upstream; keep its stored row
+            seen.update(failed)
+            # an empty feed is far more likely a bad fetch than a wiped dataset
+            if delete_missing and seen:
+                removed = [
+                    cid for cid, (_h, deleted) in stored.items()
+                    if not deleted and cid not in seen
+                ]
+                if removed:
+                    cur.execute(
+                        "UPDATE yc_companies SET deleted_at = now() WHERE id = ANY(%s);",
+                        (removed,),
+                    )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return {**counts, "removed": len(removed), "failed": len(failed)}
 
 
 # ---------------------------------------------------------------------------
@@ -303,16 +1350,140 @@ def save_companies_to_db(
 def get_companies(
     conn: psycopg2.extensions.connection,
     limit: int = 100,
+    after_id: int | None = None,
 ) -> list[dict]:
-    """Return up to *limit* companies currently stored in DB."""
+    """Return up to *limit* companies currently stored in DB.
+
+    Rows are ordered by id; pass the last id seen as *after_id* to get the
+    next page (keyset pagination, no OFFSET scan).
+    """
 
     ensure_companies_table(conn)
     with conn.cursor() as cur:
-        cur.execute("SELECT * FROM yc_companies ORDER BY id LIMIT %s;", (limit,))
+        if after_id is None:
+            cur.execute(
+                "SELECT * FROM yc_companies WHERE deleted_at IS NULL ORDER BY id LIMIT %s;",
+                (limit,),
+            )
+        else:
+            cur.execute(
+                "SELECT * FROM yc_companies WHERE deleted_at IS NULL AND id > %s"
+                " ORDER BY id LIMIT %s;",
+                (after_id, limit),
+            )
         cols = [desc[0] for desc in cur.description]
         return [dict(zip(cols, row)) for row in cur.fetchall()]
 
 
+def iter_companies(
+    conn: psycopg2.extensions.connection,
+    after_id: int | None = None,
+    limit: int | None = None,
+    itersize: int = 1000,
+) -> Iterator[dict]:
+    """Yield stored companies by id through a server-side cursor.
+
+    Only *itersize* rows are buffered client-side at a time, so streaming the
+    whole table costs constant memory.
+    """
+
+    ensure_companies_table(conn)
+    query = "SELECT * FROM yc_companies WHERE deleted_at IS NULL"
+    params: list[Any] = []
+    if after_id is not None:
+        query += " AND id > %s"
+        params.append(after_id)
+    query += " ORDER BY id"
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit)
+
+    with conn.cursor(name="yc_companies_stream") as cur:
+        cur.itersize = itersize
+        cur.execute(query, params)
+        cols: list[str] | None = None
+        for row in cur:
+            if cols is None:
+                cols = [desc[0] for desc in cur.description]
+            yield dict(zip(cols, row))
+
+
+# company columns selected for query results, renamed back to the feed's keys
+_FEED_SELECT = """
+    id, name, slug, website, locations AS all_locations, one_liner,
+    long_description, industry, subindustry, industries, batch, stage,
+    status, regions, tags, team_size, is_hiring AS "isHiring", nonprofit
+"""
+
+
+def _like(value: str) -> str:
+    """Case-insensitive substring pattern for *value*, wildcards escaped."""
+    escaped = value.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def query_companies(
+    conn: psycopg2.extensions.connection,
+    industry: str | None = None,
+    status: str | None = None,
+    region: str | None = None,
+    query: str | None = None,
+    batch: str | None = None,
+    min_team_size: int | None = None,
+    limit: int | None = None,
+    offset: int = 0,
+) -> list[dict]:
+    """Run the MCP filter tools' predicates inside Postgres.
+
+    Same semantics as the in-memory tools (case-insensitive substring
+    matches, batch in either spelling) but answered from the indexed
+    `yc_companies` table. Results come back in id order with the feed's
+    field names.
+    """
+
+    ensure_companies_table(conn)
+    where = ["deleted_at IS NULL"]
+    params: list[Any] = []
+    if industry:
+        where.append("(lower(industry) LIKE %s OR yc_array_text(industries) LIKE %s)")
+        params += [_like(industry)] * 2
+    if status:
+        where.append("lower(status) LIKE %s")
+        params.append(_like(status))
+    if region:
+        where.append("yc_array_text(regions) LIKE %s")
+        params.append(_like(region))
+    if query:
+        where.append(
+            "(lower(name) LIKE %s OR lower(one_liner) LIKE %s"
+            " OR lower(long_description) LIKE %s OR yc_array_text(tags) LIKE %s)"
+        )
+        params += [_like(query)] * 4
+    if batch:
+        where.append("lower(replace(batch, ' ', '-')) = %s")
+        params.append(batch_slug(batch))
+    if min_team_size is not None:
+        # a missing team size counts as 0, as in the in-memory index; above 0
+        # that rules NULLs out anyway, so keep the predicate on the bare column
+        where.append("team_size >= %s" if min_team_size > 0 else "COALESCE(team_size, 0) >= %s")
+        params.append(min_team_size)
+
+    sql = f"SELECT {_FEED_SELECT} FROM yc_companies WHERE {' AND '.join(where)} ORDER BY id"
+    if limit is not None:
+        sql += " LIMIT %s"
+        params.append(limit)
+    if offset:
+        sql += " OFFSET %s"
+        params.append(offset)
+
+    with conn.cursor() as cur:
+        cur.execute(sql, params)
+        cols = [desc[0] for desc in cur.description]
+        rows = [dict(zip(cols, row)) for row in cur.fetchall()]
+    conn.rollback()  # read-only; don't leave the connection idle in transaction
+    return rows
+
+
 # ---------------------------------------------------------------------------
 # Convenience CLI printing
 # ---------------------------------------------------------------------------
@@ -0,0 +1,157 @@
+"""HTML parser backends shared by the scrapers.
+
+Three interchangeable engines, fastest first:
+
+* ``selectolax`` – the lexbor engine (C), via `pip install selectolax`
+* ``lxml``       – BeautifulSoup on top of libxml2, via `pip install lxml`
+* ``html.parser`` – BeautifulSoup on the stdlib parser, always available
+
+Every backend exposes the same four operations the extractors need (parse,
+compile a CSS selector, element text, element attribute) with the same
+results: text is each text node stripped and joined, attributes are plain
+strings. `HTML_PARSER` picks the default; otherwise it is the fastest one
+installed.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Callable
+
+import soupsieve
+from bs4 import BeautifulSoup
+
+PARSERS = ("selectolax", "lxml", "html.parser")
+
+_INSTALLED = {
+    "selectolax": importlib.util.find_spec("selectolax") is not None,
+    "lxml": importlib.util.find_spec("lxml") is not None,
+    "html.parser": True,
+}
+
+
+class ParserBackend(ABC):
+    """One HTML engine behind the operations used by the scrapers."""
+
+    name: str
+
+    @abstractmethod
+    def parse(self, html: str) -> Any:
+        """Parse *html* and return the node to run selectors against."""
+
+    @abstractmethod
+    def compile(self, selector: str) -> Callable[[Any], list]:
+        """Compile a CSS *selector* into ``node -> matching descendants``."""
+
+    @abstractmethod
+    def text(self, node: Any) -> str:
+        """Text of *node*, every text part stripped and joined."""
+
+    @abstractmethod
+    def attr(self, node: Any, name: str) -> str:
+        """Attribute *name* of *node* ("" when absent or valueless)."""
+
+
+class SoupBackend(ParserBackend):
+    """BeautifulSoup with a given tree builder; selectors via soupsieve."""
+
+    def __init__(self, features: str):
+        self.name = features
+        self.features = features
+
+    def parse(self, html: str) -> BeautifulSoup:
+        # single-string attributes, matching what the other engines return
+        return BeautifulSoup(html, self.features, multi_valued_attributes=None)
+
+    def compile(self, selector: str) -> Callable[[Any], list]:
+        return soupsieve.compile(selector).select
+
+    def text(self, node: Any) -> str:
+        return node.get_text(strip=True)
+
+    def attr(self, node: Any, name: str) -> str:
+        return node.get(name) or ""
+
+
+class LexborBackend(ParserBackend):
+    """selectolax's lexbor engine; parsing and CSS matching run in C."""
+
+    name = "selectolax"
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser = LexborHTMLParser
+
+    def parse(self, html: str) -> Any:
+        # the document node, so that selectors can match <html> itself
+        return self._parser(html).root.parent
+
+    def compile(self, selector: str) -> Callable[[Any], list]:
+        def select(node: Any) -> list:
+            matches = node.css(selector)
+            # lexbor also matches the context node; soupsieve only its descendants
+            if matches and matches[0].mem_id == node.mem_id:
+                del matches[0]
+            return matches
+        return select
+
+    def text(self, node: Any) -> str:
+        return node.text(deep=True, separator="", strip=True)
+
+    def attr(self, node: Any, name: str) -> str:
+        return node.attributes.get(name) or ""
+
+
+def available_parsers() -> list[str]:
+    """Installed parser names, fastest first."""
+    return [name for name in PARSERS if _INSTALLED[name]]
+
+
+def fastest_parser() -> str:
+    return available_parsers()[0]
+
+
+# parser used when a caller does not ask for one
+HTML_PARSER = os.getenv("HTML_PARSER") or fastest_parser()
+
+_backends: dict[str, ParserBackend] = {}
+
+
+def get_backend(name: str | None = None) -> ParserBackend:
+    """Return the backend *name* (default `HTML_PARSER`).
+
+    Raises ValueError for unknown or uninstalled parsers.
+    """
+    name = name or HTML_PARSER
+    backend = _backends.get(name)
+    if backend is not None:
+        return backend
+    if name not in _INSTALLED:
+        raise ValueError(f"Unknown HTML parser '{name}'. Allowed: {', '.join(PARSERS)}")
+    if not _INSTALLED[name]:
+        raise ValueError(f"HTML parser '{name}' is not installed")
+    backend = LexborBackend() if name == "selectolax" else SoupBackend(name)
+    _backends[name] = backend
+    return backend
+
+
+def soup_features(name: str | None = None) -> str:
+    """BeautifulSoup tree builder for callers that need a soup object.
+
+    *name* (default `HTML_PARSER`) is used when it is a BeautifulSoup
+    builder; otherwise the fastest installed builder is.
+    """
+    name = name or HTML_PARSER
+    if name != "selectolax":
+        get_backend(name)  # validates it
+        return name
+    return "lxml" if _INSTALLED["lxml"] else "html.parser"
+
+
+def parse_title(html: str, parser: str | None = None) -> str | None:
+    """Text of the first ``<title>`` in *html*, or None if there is none."""
+    backend = get_backend(parser)
+    titles = backend.compile("title")(backend.parse(html))
+    return backend.text(titles[0]) if titles else None
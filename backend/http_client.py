@@ -0,0 +1,84 @@
+"""Shared HTTP clients for every outbound request.
+
+One `httpx.Client` (threads, sync code) and one `httpx.AsyncClient` (the
+async endpoints) per process. Both pool connections per host and keep them
+alive between requests, so a repeat request to a host skips the DNS, TCP and
+TLS setup. Compressed responses are decoded transparently (gzip/deflate, plus
+br/zstd when `brotli`/`zstandard` are installed). HTTP/2 is negotiated when
+`HTTP2` is enabled and the `h2` package is installed (`pip install
+httpx[http2]`). FastAPI closes both clients on shutdown.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import threading
+
+import httpx
+
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "15"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+# seconds an idle pooled connection is kept open
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+# negotiate HTTP/2 where the server offers it (needs the optional h2 package)
+HTTP2 = (
+    os.getenv("HTTP2", "true").lower() in ("1", "true", "yes")
+    and importlib.util.find_spec("h2") is not None
+)
+
+_client: httpx.Client | None = None
+_client_lock = threading.Lock()
+_async_client: httpx.AsyncClient | None = None
+
+
+def _client_options() -> dict:
+    return {
+        "timeout": HTTP_TIMEOUT,
+        "follow_redirects": True,
+        "http2": HTTP2,
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    }
+
+
+def get_client() -> httpx.Client:
+    """Return the process-wide sync client, creating it on first use.
+
+    It is thread-safe; share it instead of calling ``requests.get``.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        with _client_lock:
+            if _client is None or _client.is_closed:
+                _client = httpx.Client(**_client_options())
+    return _client
+
+
+def close_client() -> None:
+    """Close the shared sync client (if one was created)."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Return the process-wide async client, creating it on first use."""
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(**_client_options())
+    return _async_client
+
+
+async def aclose_async_client() -> None:
+    """Close the shared async client (if one was created)."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
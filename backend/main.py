@@ -1,10 +1,19 @@
 #!/usr/bin/env python3
 """FastAPI backend entry point."""
 
+import itertools
+import logging
 import os
 import sys
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterable, Iterator
+import anyio
+import httpx
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
 
 # load environment variables like PG_USER and PG_PASSWORD
 load_dotenv()
@@ -15,21 +24,120 @@ sys.path.append(PROJECT_ROOT)
 sys.path.append(ROOT)
 
 
-app = FastAPI(title="MCPInception API")
+# the shared HTTP client is taken via helpers so both use the same instance
 from backend.helpers import (
-    db_connect,
-    get_yc_companies,
-    save_companies_to_db,
+    aclose_async_client,
+    close_client,
+    db_checkin,
+    db_checkout,
+    db_pool_close,
+    db_pool_open,
+    YC_CATEGORIES,
+    get_yc_snapshot_async,
+    get_yc_id_order_async,
+    sync_companies,
     get_companies,
-    get_yc_batch_companies,
+    get_yc_batch_companies_async,
+    CompanyStats,
+    iter_companies,
+    iter_yc_companies,
+    fetch_title_async,
 )
+from backend.serialization import COMPRESS_MIN_BYTES, dumps, json_response
 
+NDJSON = "application/x-ndjson"
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Open the DB pool once at startup; close it and the HTTP clients on shutdown."""
+    try:
+        await run_in_threadpool(db_pool_open)
+    except Exception as exc:  # pylint: disable=broad-except
+        # the YC proxy endpoints still work without a database
+        logging.warning("Database pool unavailable at startup: %s", exc)
+    yield
+    await aclose_async_client()
+    close_client()
+    db_pool_close()
+
+
+app = FastAPI(
+    title="MCPInception API",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+# compresses whatever did not already negotiate its own Content-Encoding
+app.add_middleware(GZipMiddleware, minimum_size=COMPRESS_MIN_BYTES)
+
+
+@contextmanager
 def get_db_conn():
-    """Return a psycopg2 connection to configured DB."""
+    """Check out a pooled psycopg2 connection for the duration of a request."""
     try:
-        return db_connect()
+        conn = db_checkout()
     except Exception as exc:  # pylint: disable=broad-except
         raise HTTPException(status_code=500, detail=f"Database connection failed: {exc}") from exc
+    try:
+        yield conn
+    finally:
+        db_checkin(conn)
+
+
+async def run_db(fn, *args):
+    """Run blocking DB helper *fn(conn, *args)* in the threadpool.
+
+    psycopg2 is synchronous, so every query goes through here to keep the
+    event loop free for other requests.
+    """
+
+    def call():
+        with get_db_conn() as conn:
+            return fn(conn, *args)
+
+    return await run_in_threadpool(call)
+
+
+def ndjson_lines(rows: Iterable[dict], chunk_rows: int = 256) -> Iterator[bytes]:
+    """Encode *rows* as NDJSON, flushing every *chunk_rows* lines."""
+    lines: list[bytes] = []
+    for row in rows:
+        lines.append(dumps(row))
+        if len(lines) >= chunk_rows:
+            yield b"\n".join(lines) + b"\n"
+            lines.clear()
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+
+def ndjson_response(rows: Iterable[dict], next_after_id: int | None = None) -> StreamingResponse:
+    """Stream *rows* as NDJSON; the keyset cursor travels in a header."""
+    headers = {"X-Next-After-Id": str(next_after_id)} if next_after_id is not None else None
+    return StreamingResponse(ndjson_lines(rows), media_type=NDJSON, headers=headers)
+
+
+async def stream_stored_companies(after_id: int | None, limit: int | None) -> AsyncIterator[bytes]:
+    """NDJSON chunks of the stored companies, read over a pooled connection.
+
+    The connection is checked out once streaming starts and checked back in
+    by `finally`, which also runs when the client disconnects mid-stream, so
+    neither an abandoned nor a never-started response can leak it.
+    """
+    conn = await run_in_threadpool(db_checkout)
+    chunks = ndjson_lines(iter_companies(conn, after_id, limit))
+
+    def release() -> None:
+        try:
+            chunks.close()  # closes the server-side cursor
+        finally:
+            db_checkin(conn)
+
+    try:
+        async for chunk in iterate_in_threadpool(chunks):
+            yield chunk
+    finally:
+        with anyio.CancelScope(shield=True):
+            await run_in_threadpool(release)
 
 
 @app.get("/health")
@@ -39,63 +147,130 @@ async def health_check():
 
 
 @app.get("/scrape")
-async def scrape(url: str = "http://127.0.0.1:8000/scrape?url=https://www.ycombinator.com/"):
-    """Scrape a URL and return its title."""
-    import requests  # local import to keep top tidy
-    from bs4 import BeautifulSoup
+async def scrape(
+    url: str = "http://127.0.0.1:8000/scrape?url=https://www.ycombinator.com/",
+    parser: str | None = None,
+):
+    """Scrape a URL and return its title.
+
+    Only the start of the page is downloaded: reading stops once the title
+    (or the end of `<head>`) has arrived, or after `SCRAPE_MAX_BYTES`.
+    `parser` picks the HTML engine (selectolax, lxml or html.parser);
+    by default the fastest one installed.
+    """
 
-    response = requests.get(url, timeout=10)
-    if response.status_code != 200:
+    try:
+        title = await fetch_title_async(url, parser)
+    except httpx.HTTPError:
         raise HTTPException(status_code=400, detail="Failed to fetch URL")
-    soup = BeautifulSoup(response.text, "html.parser")
-    title = soup.title.string if soup.title else "No title found"
-    return {"title": title}
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+    return {"title": title or "No title found"}
 
 
 @app.get("/yc")
 async def yc_companies(
+    request: Request,
     category: str = "all",
     persist: bool = False,
+    after_id: int | None = None,
+    limit: int | None = Query(None, ge=1),
+    output: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
 ):
     """Return YC companies list by *category*.
 
-    If `persist=true`, rows are validated via Pydantic and upserted into the
-    `yc_companies` Postgres table.
+    If `persist=true`, rows are validated via Pydantic and synced into the
+    `yc_companies` Postgres table: only new or changed rows are written, and
+    for `category=all` rows missing upstream are soft-deleted. `saved`
+    reports how many rows were written and `persisted` the full change
+    summary.
+
+    Passing `after_id` and/or `limit` pages through the companies ordered by
+    id; `next_after_id` is the cursor for the next page. `format=ndjson`
+    streams one company per line instead of a single JSON document.
     """
 
+    if category.lower() not in YC_CATEGORIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported category '{category}'. Allowed: {', '.join(YC_CATEGORIES)}",
+        )
+    paginated = after_id is not None or limit is not None
+
+    # plain NDJSON dump: stream straight off the upstream download, once the
+    # first company is in hand so a failed fetch still gets an error status
+    if output == "ndjson" and not paginated and not persist:
+        rows = iter_yc_companies(category)
+        try:
+            first = await run_in_threadpool(next, rows, None)
+        except ValueError as err:
+            raise HTTPException(status_code=400, detail=str(err))
+        except Exception as exc:  # pylint: disable=broad-except
+            raise HTTPException(status_code=500, detail=f"Failed to fetch YC data: {exc}")
+        return ndjson_response(itertools.chain((first,), rows) if first is not None else ())
+
     try:
-        data = get_yc_companies(category)
+        snapshot = await get_yc_snapshot_async(category)
+        data = snapshot.companies
 
-        saved = None
+        stats = None
         if persist:
-            conn = get_db_conn()
-            saved = save_companies_to_db(conn, data)
-            conn.close()
-
-        return {
-            "category": category,
-            "count": len(data),
-            **({"saved": saved} if saved is not None else {}),
-            "companies": data,
-        }
+            stats = await run_db(sync_companies, data, category.lower() == "all")
+
+        next_after_id = None
+        if paginated:
+            order = await get_yc_id_order_async(category)
+            data = order.page(after_id, limit)
+            if data and limit is not None and order.has_more(data[-1]["id"]):
+                next_after_id = data[-1]["id"]
     except ValueError as err:
         raise HTTPException(status_code=400, detail=str(err))
     except Exception as exc:  # pylint: disable=broad-except
         raise HTTPException(status_code=500, detail=f"Failed to fetch YC data: {exc}")
 
+    if output == "ndjson":
+        return ndjson_response(data, next_after_id)
+
+    # the same slice of the same snapshot always encodes to the same bytes
+    key = None if persist else ("yc", category, snapshot.version, after_id, limit)
+    return await json_response(
+        request.headers.get("accept-encoding"),
+        key,
+        lambda: {
+            "category": category,
+            "count": len(data),
+            **({"saved": stats["added"] + stats["changed"], "persisted": stats}
+               if stats is not None else {}),
+            **({"next_after_id": next_after_id} if paginated else {}),
+            "companies": data,
+        },
+    )
+
 
 # ---------------------------------------------------------------------------
 # DB inspect endpoint
 # ---------------------------------------------------------------------------
 
 @app.get("/yc/db")
-async def yc_db(limit: int = 100):
-    """Return *limit* YC company rows from the database."""
+async def yc_db(
+    limit: int | None = Query(None, ge=1),
+    after_id: int | None = None,
+    output: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
+):
+    """Return YC company rows from the database, ordered by id.
+
+    JSON responses return *limit* rows (default 100) plus `next_after_id`
+    for the next page. `format=ndjson` streams rows through a server-side
+    cursor and is unbounded unless *limit* is given.
+    """
+
+    if output == "ndjson":
+        return StreamingResponse(stream_stored_companies(after_id, limit), media_type=NDJSON)
 
-    conn = get_db_conn()
-    rows = get_companies(conn, limit)
-    conn.close()
-    return {"count": len(rows), "companies": rows}
+    limit = limit or 100
+    rows = await run_db(get_companies, limit, after_id)
+    next_after_id = rows[-1]["id"] if len(rows) == limit else None
+    return {"count": len(rows), "next_after_id": next_after_id, "companies": rows}
 
 
 # ---------------------------------------------------------------------------
@@ -103,18 +278,52 @@ async def yc_db(limit: int = 100):
 # ---------------------------------------------------------------------------
 
 @app.get("/yc/batch")
-async def yc_batch(batch: str = "Winter 2012"):
+async def yc_batch(request: Request, batch: str = "Winter 2012"):
     """Return companies for a given YC *batch* (e.g. 'Winter 2012')."""
 
     try:
-        data = get_yc_batch_companies(batch)
-        return {"batch": batch, "count": len(data), "companies": data}
+        snapshot = await get_yc_snapshot_async("all")
+        data = await get_yc_batch_companies_async(batch)
+        return await json_response(
+            request.headers.get("accept-encoding"),
+            ("yc/batch", snapshot.version, batch),
+            lambda: {"batch": batch, "count": len(data), "companies": data},
+        )
     except ValueError as err:
         raise HTTPException(status_code=404, detail=str(err))
     except Exception as exc:  # pylint: disable=broad-except
         raise HTTPException(status_code=500, detail=f"Failed to fetch batch: {exc}")
 
 
+@app.get("/yc/stats")
+async def yc_stats(request: Request, category: str = "all", group_by: str | None = None):
+    """Return precomputed company counts for *category*.
+
+    Counts per batch (with hiring ratio and team-size distribution),
+    industry, status, region and team-size bucket; `group_by` narrows the
+    answer to one of them. Counts are kept per snapshot and carried over
+    incrementally when the upstream data changes.
+    """
+
+    if category.lower() not in YC_CATEGORIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported category '{category}'. Allowed: {', '.join(YC_CATEGORIES)}",
+        )
+    try:
+        snapshot = await get_yc_snapshot_async(category)
+        view = snapshot.derive("stats", CompanyStats).view(group_by)
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+    except Exception as exc:  # pylint: disable=broad-except
+        raise HTTPException(status_code=500, detail=f"Failed to compute stats: {exc}")
+    return await json_response(
+        request.headers.get("accept-encoding"),
+        ("yc/stats", category.lower(), snapshot.version, group_by),
+        lambda: view,
+    )
+
+
 """
 cd backend &&
 uv run -m uvicorn main:app --reload --host 0.0.0.0 --port 8000
@@ -132,10 +341,13 @@ curl 'http://127.0.0.1:8000/yc?category=top' | jq '.count'
 curl 'http://127.0.0.1:8000/yc?category=hiring&persist=true' | jq '.saved'
 
 curl 'http://127.0.0.1:8000/yc/db?limit=20' | jq
+curl 'http://127.0.0.1:8000/yc/db?limit=20&after_id=120' | jq '.next_after_id'
+curl 'http://127.0.0.1:8000/yc?format=ndjson' | head -3
 
 
 ### Request all YC Companies from a batch (Summer 2015 for example)
 cd backend && uv run -m uvicorn main:app --reload
 
 curl 'http://127.0.0.1:8000/yc/batch?batch=Summer%202015' | jq '.count'
+curl 'http://127.0.0.1:8000/yc/stats?group_by=status' | jq
 """
@@ -1,18 +1,43 @@
-import requests
+import heapq
 import json
-from bs4 import BeautifulSoup
-from typing import Dict, List, Any, Optional, Union
+import os
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
+from urllib.parse import urldefrag, urljoin, urlsplit
+from typing import Dict, Iterator, List, Any, Optional, Union
 from pydantic import BaseModel, Field
-from fastapi import FastAPI, Query
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from fastapi.openapi.utils import get_openapi
 from fastapi.middleware.cors import CORSMiddleware
 import re
 import logging
+import threading
+
+from html_parsers import PARSERS, ParserBackend, get_backend
+from page_cache import fetch_page, page_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# server-side ceilings on the concurrency a request may ask for
+SCRAPE_MAX_CONCURRENCY = int(os.getenv("SCRAPE_MAX_CONCURRENCY", "32"))
+SCRAPE_MAX_PER_HOST = int(os.getenv("SCRAPE_MAX_PER_HOST", "8"))
+
+# Shared by every request, so concurrent crawls and batches cannot multiply
+# the caps above: batch jobs run on one pool, crawl page fetches on another
+# (their tasks never wait on other tasks, so the pools cannot deadlock), and
+# every page fetch, wherever it runs, holds one of the fetch slots.
+_job_pool = ThreadPoolExecutor(max_workers=SCRAPE_MAX_CONCURRENCY, thread_name_prefix="scrape-job")
+_page_pool = ThreadPoolExecutor(max_workers=SCRAPE_MAX_CONCURRENCY, thread_name_prefix="scrape-page")
+_fetch_slots = threading.BoundedSemaphore(SCRAPE_MAX_CONCURRENCY)
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
 class ScrapingConfig(BaseModel):
     """Configuration for website scraping"""
     url: str = Field(..., description="URL of the website to scrape")
@@ -20,6 +45,54 @@ class ScrapingConfig(BaseModel):
     pagination: Optional[Dict[str, str]] = Field(None, description="Pagination configuration if needed")
     max_pages: int = Field(1, description="Maximum number of pages to scrape")
     headers: Optional[Dict[str, str]] = Field(None, description="Custom headers for the request")
+    crawl: bool = Field(False, description="Fetch pages concurrently from a URL frontier instead of one at a time")
+    follow: Optional[str] = Field(None, description="CSS selector of extra listing links to crawl (crawl mode)")
+    max_concurrency: int = Field(8, ge=1, le=SCRAPE_MAX_CONCURRENCY, description="Maximum pages fetched at once (crawl mode)")
+    max_per_host: int = Field(4, ge=1, le=SCRAPE_MAX_PER_HOST, description="Maximum pages fetched at once from one host (crawl mode)")
+    same_host: bool = Field(True, description="Only crawl links on the starting URL's host (crawl mode)")
+    parser: Optional[str] = Field(None, description=f"HTML parser: one of {', '.join(PARSERS)} (default: the service's)")
+    cache: bool = Field(True, description="Reuse cached pages and the data already extracted from them (honours Cache-Control)")
+
+class SelectorPlan:
+    """The selectors of a ScrapingConfig, parsed and compiled once
+
+    Field selectors are split into a compiled CSS matcher plus the optional
+    `::attr` suffix, next to the compiled container, pagination and follow
+    selectors. Matchers belong to one parser backend. Plans are cached by
+    selector text and backend (see `for_config`), so every container on
+    every page, and every later scrape with the same selectors, reuses the
+    same matchers. The config is never modified.
+    """
+
+    def __init__(self, backend: ParserBackend, selectors: tuple, next_selector: Optional[str],
+                 next_attr: str, follow: Optional[str]):
+        self.backend = backend
+        fields = dict(selectors)
+        container = fields.pop("container", None)
+        self.container = backend.compile(container) if container else None
+        self.fields = []
+        for field, selector in fields.items():
+            # Check if we need to extract an attribute
+            attr = None
+            if "::" in selector:
+                selector, attr = selector.split("::", 1)
+            self.fields.append((field, backend.compile(selector), attr))
+        self.next_link = backend.compile(next_selector) if next_selector else None
+        self.next_attr = next_attr
+        self.follow = backend.compile(follow) if follow else None
+
+    @staticmethod
+    def for_config(config: "ScrapingConfig", backend: ParserBackend) -> "SelectorPlan":
+        """Return the (cached) plan for *config* on *backend*"""
+        pagination = config.pagination or {}
+        return _compile_plan(backend, tuple(config.selectors.items()), pagination.get("selector"),
+                             pagination.get("attr", "href"), config.follow)
+
+
+@lru_cache(maxsize=128)
+def _compile_plan(backend: ParserBackend, selectors: tuple, next_selector: Optional[str],
+                  next_attr: str, follow: Optional[str]) -> SelectorPlan:
+    return SelectorPlan(backend, selectors, next_selector, next_attr, follow)
 
 class ScrapedData(BaseModel):
     """Model for the scraped data"""
@@ -27,8 +100,16 @@ class ScrapedData(BaseModel):
     timestamp: str
     data: List[Dict[str, Any]]
 
+class BatchScrapeRequest(BaseModel):
+    """Many scraping jobs run on one worker pool"""
+    configs: List[ScrapingConfig] = Field(..., min_length=1, description="Scraping jobs to run")
+    max_concurrency: int = Field(8, ge=1, le=SCRAPE_MAX_CONCURRENCY, description="Maximum jobs run at once")
+    max_per_host: int = Field(2, ge=1, le=SCRAPE_MAX_PER_HOST, description="Maximum jobs run at once against one host")
+
 class WebScraper:
-    def __init__(self):
+    def __init__(self, parser: Optional[str] = None):
+        # default HTML parser for configs that do not choose one
+        self.parser = get_backend(parser).name
         self.app = FastAPI(title="WebScraper API", description="API for scraping static websites")
         
         # Add CORS middleware
@@ -44,13 +125,25 @@ class WebScraper:
     
     def _setup_routes(self):
         """Set up the API routes"""
+        # scraping blocks on the network, so the routes are plain `def` and run
+        # in FastAPI's threadpool instead of on the event loop
         @self.app.post("/scrape", response_model=ScrapedData)
-        async def scrape(config: ScrapingConfig):
-            return self.scrape_website(config)
+        def scrape(config: ScrapingConfig):
+            try:
+                return self.scrape_website(config)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        
+        @self.app.post("/scrape/batch")
+        def scrape_batch(batch: BatchScrapeRequest):
+            """Run many configs; stream one NDJSON line per job as it finishes"""
+            lines = (json.dumps(outcome) + "\n" for outcome in self.scrape_batch(batch))
+            return StreamingResponse(lines, media_type="application/x-ndjson")
         
         @self.app.get("/scraper")
-        async def simple_scraper(url: str = Query(..., description="URL to scrape"),
-                               serverName: Optional[str] = Query(None, description="Optional server name")):
+        def simple_scraper(url: str = Query(..., description="URL to scrape"),
+                               serverName: Optional[str] = Query(None, description="Optional server name"),
+                               parser: Optional[str] = Query(None, description="Optional HTML parser backend")):
             """Simple endpoint that accepts a URL and returns scraped data"""
             from datetime import datetime
             
@@ -67,7 +160,8 @@ class WebScraper:
                         "links": "a::href",
                         "images": "img::src"
                     },
-                    max_pages=1
+                    max_pages=1,
+                    parser=parser
                 )
                 
                 result = self.scrape_website(config)
@@ -92,47 +186,26 @@ class WebScraper:
         """Scrape a website based on the provided configuration"""
         from datetime import datetime
         
+        if config.crawl:
+            return self.crawl_website(config)
+
         all_data = []
         current_url = config.url
+        backend = get_backend(config.parser or self.parser)
+        plan = SelectorPlan.for_config(config, backend)
         
         try:
             for page in range(config.max_pages):
                 logger.info(f"Scraping page {page+1}: {current_url}")
                 
-                # Make the request
-                headers = config.headers or {
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-                }
-                response = requests.get(current_url, headers=headers)
-                response.raise_for_status()
-                
-                # Parse the HTML
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Extract data based on selectors
-                page_data = self._extract_data(soup, config.selectors)
+                # Fetch (or reuse) the page and extract data based on selectors
+                headers = config.headers or DEFAULT_HEADERS
+                page_data, next_urls, _ = self._scrape_page(current_url, headers, plan, config.cache)
                 all_data.extend(page_data)
                 
                 # Handle pagination if configured and we haven't reached max_pages
-                if config.pagination and page < config.max_pages - 1:
-                    next_link = soup.select_one(config.pagination.get("selector", ""))
-                    if next_link:
-                        if "attr" in config.pagination:
-                            next_url = next_link.get(config.pagination["attr"])
-                        else:
-                            next_url = next_link.get("href")
-                            
-                        # Handle relative URLs
-                        if next_url and not (next_url.startswith("http://") or next_url.startswith("https://")):
-                            from urllib.parse import urljoin
-                            next_url = urljoin(current_url, next_url)
-                        
-                        if next_url:
-                            current_url = next_url
-                        else:
-                            break
-                    else:
-                        break
+                if config.pagination and page < config.max_pages - 1 and next_urls:
+                    current_url = next_urls[0]
                 else:
                     break
                     
@@ -146,36 +219,190 @@ class WebScraper:
             logger.error(f"Error scraping website: {str(e)}")
             raise
     
-    def _extract_data(self, soup: BeautifulSoup, selectors: Dict[str, str]) -> List[Dict[str, Any]]:
-        """Extract data from the soup based on the selectors"""
+    def crawl_website(self, config: ScrapingConfig) -> ScrapedData:
+        """Scrape up to `max_pages` pages concurrently, starting from `config.url`
+
+        Pages are ranked breadth-first by where they are linked from: by link
+        depth, then by the rank of the linking page, then by position among
+        its links (the pagination selector first, then `follow`). The
+        frontier is fetched in rank order with at most `max_concurrency`
+        requests in flight, `max_per_host` per host, each URL at most once,
+        and the results are merged back in rank order, so for ordinary
+        next/listing links the data comes out in page order. Pages are
+        fetched on the pool shared by all crawls.
+        """
+        from datetime import datetime
+
+        headers = config.headers or DEFAULT_HEADERS
+        plan = SelectorPlan.for_config(config, get_backend(config.parser or self.parser))
+        start_host = urlsplit(config.url).netloc
+        # url -> best rank seen so far; a link found again from a better-ranked
+        # page (which may simply have finished later) moves up
+        start = urldefrag(config.url)[0]
+        ranks: Dict[str, tuple] = {start: (0,)}
+        frontier: List[tuple] = [((0,), start)]
+        pages: Dict[str, List[Dict[str, Any]]] = {}
+        in_flight: Dict[Any, tuple] = {}
+        host_load: Counter = Counter()
+
+        try:
+            while frontier or in_flight:
+                # start pages in order while the global and per-host limits allow
+                waiting = []
+                while frontier and len(in_flight) < config.max_concurrency:
+                    order, url = heapq.heappop(frontier)
+                    host = urlsplit(url).netloc
+                    if host_load[host] >= config.max_per_host:
+                        waiting.append((order, url))
+                        continue
+                    host_load[host] += 1
+                    logger.info(f"Crawling page {url}")
+                    future = _page_pool.submit(self._crawl_page, url, headers, plan, config.cache)
+                    in_flight[future] = (order, url, host)
+                for item in waiting:
+                    heapq.heappush(frontier, item)
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    order, url, host = in_flight.pop(future)
+                    host_load[host] -= 1
+                    try:
+                        page_data, links = future.result()
+                    except Exception as e:
+                        if order == (0,):
+                            logger.error(f"Error scraping website: {str(e)}")
+                            raise
+                        logger.warning(f"Skipping page {url}: {str(e)}")
+                        continue
+                    pages[url] = page_data
+
+                    rank = ranks[url]
+                    for index, link in enumerate(links):
+                        if config.same_host and urlsplit(link).netloc != start_host:
+                            continue
+                        link_rank = (rank[0] + 1, rank, index)
+                        if link in ranks:
+                            ranks[link] = min(ranks[link], link_rank)
+                        elif len(ranks) < config.max_pages:
+                            ranks[link] = link_rank
+                            heapq.heappush(frontier, (link_rank, link))
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+        return ScrapedData(
+            source_url=config.url,
+            timestamp=datetime.now().isoformat(),
+            data=[item for url in sorted(pages, key=ranks.__getitem__) for item in pages[url]]
+        )
+
+    def scrape_batch(self, batch: BatchScrapeRequest) -> Iterator[Dict[str, Any]]:
+        """Run every config of `batch` on a worker pool, yielding outcomes as they finish
+
+        At most `max_concurrency` jobs run at once and at most `max_per_host`
+        against one host; free slots go to hosts in turn, so a long list for
+        one site does not hold up the others. Crawl-mode jobs share
+        `SCRAPE_MAX_CONCURRENCY` between them, so their page fetches are
+        clamped to an equal share of it. Each outcome carries the job's
+        `index` and `url` plus either its `result` or its `error`; a failing
+        job never affects the rest. Jobs run on the pool shared by all
+        batches.
+        """
+        queues: Dict[str, deque] = {}
+        for index, config in enumerate(batch.configs):
+            queues.setdefault(urlsplit(config.url).netloc, deque()).append((index, config))
+        hosts = deque(queues)  # hosts with queued jobs, in round-robin order
+        in_flight: Dict[Any, tuple] = {}
+        host_load: Counter = Counter()
+        crawl_share = max(1, SCRAPE_MAX_CONCURRENCY // batch.max_concurrency)
+
+        try:
+            while hosts or in_flight:
+                # hand free slots to hosts in turn, skipping hosts at their limit
+                skipped = 0
+                while hosts and len(in_flight) < batch.max_concurrency and skipped < len(hosts):
+                    host = hosts[0]
+                    hosts.rotate(-1)
+                    if host_load[host] >= batch.max_per_host:
+                        skipped += 1
+                        continue
+                    skipped = 0
+                    index, config = queues[host].popleft()
+                    if not queues[host]:
+                        hosts.pop()
+                    host_load[host] += 1
+                    if config.crawl and config.max_concurrency > crawl_share:
+                        config = config.model_copy(update={"max_concurrency": crawl_share})
+                    in_flight[_job_pool.submit(self.scrape_website, config)] = (index, config.url, host)
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, url, host = in_flight.pop(future)
+                    host_load[host] -= 1
+                    try:
+                        outcome = {"result": future.result().model_dump()}
+                    except Exception as e:
+                        logger.warning(f"Batch job {index} ({url}) failed: {str(e)}")
+                        outcome = {"error": str(e)}
+                    yield {"index": index, "url": url, **outcome}
+        finally:
+            # the client may have gone away: drop jobs that have not started
+            for future in in_flight:
+                future.cancel()
+
+    def _scrape_page(self, url: str, headers: Dict[str, str], plan: SelectorPlan, use_cache: bool) -> tuple:
+        """Fetch one page through the response cache and extract it with `plan`
+
+        Returns the page's data, its pagination URLs and its `follow` URLs.
+        The extraction is kept on the cached page, so an unchanged page
+        (fresh, or revalidated with a 304) is not parsed again. The work
+        holds one of the process-wide fetch slots.
+        """
+        with _fetch_slots:
+            page = fetch_page(url, headers, page_cache if use_cache else None)
+            return page.derive(("extract", plan), lambda: self._parse_page(page.text, url, plan))
+
+    def _parse_page(self, html: str, url: str, plan: SelectorPlan) -> tuple:
+        """Parse and extract one page; return its data, pagination and follow URLs"""
+        document = plan.backend.parse(html)
+        links = []
+        for matcher, link_attr in ((plan.next_link, plan.next_attr), (plan.follow, "href")):
+            elements = matcher(document) if matcher else []
+            hrefs = [plan.backend.attr(element, link_attr) for element in elements]
+            links.append([urljoin(url, href) for href in hrefs if href])
+        next_urls, follow_urls = links
+        return self._extract_data(document, plan), next_urls, follow_urls
+
+    def _crawl_page(self, url: str, headers: Dict[str, str], plan: SelectorPlan, use_cache: bool) -> tuple:
+        """Fetch and parse one crawl page; return its data and outgoing links"""
+        page_data, next_urls, follow_urls = self._scrape_page(url, headers, plan, use_cache)
+        return page_data, [urldefrag(link)[0] for link in next_urls + follow_urls]
+
+    def _extract_data(self, document: Any, plan: SelectorPlan) -> List[Dict[str, Any]]:
+        """Extract data from a parsed document with a compiled selector plan"""
         results = []
+        text, get_attr = plan.backend.text, plan.backend.attr
         
         # Find the container elements if specified
-        container_selector = selectors.pop("container", None)
-        containers = soup.select(container_selector) if container_selector else [soup]
+        containers = plan.container(document) if plan.container else [document]
         
         for container in containers:
             item_data = {}
             
-            for field, selector in selectors.items():
-                # Check if we need to extract an attribute
-                attr = None
-                if "::" in selector:
-                    selector, attr = selector.split("::", 1)
-                
-                elements = container.select(selector)
+            for field, matcher, attr in plan.fields:
+                elements = matcher(container)
                 
                 if len(elements) == 1:
                     element = elements[0]
                     if attr:
-                        item_data[field] = element.get(attr, "")
+                        item_data[field] = get_attr(element, attr)
                     else:
-                        item_data[field] = element.get_text(strip=True)
+                        item_data[field] = text(element)
                 elif len(elements) > 1:
                     if attr:
-                        item_data[field] = [element.get(attr, "") for element in elements]
+                        item_data[field] = [get_attr(element, attr) for element in elements]
                     else:
-                        item_data[field] = [element.get_text(strip=True) for element in elements]
+                        item_data[field] = [text(element) for element in elements]
                 else:
                     item_data[field] = None
             
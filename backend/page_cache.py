@@ -0,0 +1,368 @@
+"""HTTP response cache in front of the scrapers' fetch step.
+
+Fetched pages are kept in an in-memory LRU and, when `PAGE_CACHE_DIR` is
+set, in a disk tier shared by every process. Cache-Control is honoured: a
+page is served without a request while `max-age` (or `Expires`) says it is
+fresh, `no-store` and `private` pages are never kept, and `no-cache` pages
+are always revalidated. Requests carrying credentials bypass the cache, and
+the disk tier only records a hash of each key, never the request headers. Stale pages are revalidated with `If-None-Match` /
+`If-Modified-Since`; a 304 refreshes the entry and keeps its body, so only
+changed pages are downloaded again.
+
+Each entry can also carry values derived from its body (the data extracted
+with a selector plan, a title, ...). They live as long as the body they were
+computed from, so an unchanged page is neither refetched nor reparsed.
+"""
+
+from __future__ import annotations
+
+import email.utils
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Mapping
+
+import httpx
+import orjson
+
+from http_client import get_async_client, get_client
+
+# total bytes of page bodies kept in memory
+PAGE_CACHE_BYTES = int(os.getenv("PAGE_CACHE_BYTES", str(64 * 1024 * 1024)))
+# bodies larger than this are never cached
+PAGE_CACHE_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(2 * 1024 * 1024)))
+# seconds a page without Cache-Control/Expires is served before revalidating
+PAGE_CACHE_TTL = float(os.getenv("PAGE_CACHE_TTL", "0"))
+# directory of the disk tier ("" disables it)
+PAGE_CACHE_DIR = os.getenv("PAGE_CACHE_DIR", "")
+# total bytes of the disk tier; the least recently used files are pruned
+PAGE_CACHE_DISK_BYTES = int(os.getenv("PAGE_CACHE_DISK_BYTES", str(512 * 1024 * 1024)))
+
+# request headers whose responses are private to the caller
+_CREDENTIAL_HEADERS = frozenset({"authorization", "cookie", "proxy-authorization"})
+
+_DIRECTIVE = re.compile(r'([\w-]+)\s*(?:=\s*"?([^",]*)"?)?')
+
+
+class CachedPage:
+    """One cached response body plus its validators and derived values."""
+
+    def __init__(self, key: str, url: str, content: bytes, encoding: str,
+                 etag: str | None = None, last_modified: str | None = None,
+                 expires: float = 0.0):
+        self.key = key
+        self.url = url
+        self.content = content
+        self.encoding = encoding
+        self.etag = etag
+        self.last_modified = last_modified
+        # wall-clock time until which the page is served without revalidation
+        self.expires = expires
+        self._derived: dict[Hashable, Any] = {}
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires
+
+    def derive(self, name: Hashable, build: Callable[[], Any]) -> Any:
+        """Return the value derived from this body under *name*, building it once."""
+        try:
+            return self._derived[name]
+        except KeyError:
+            value = self._derived[name] = build()
+            return value
+
+    def meta(self) -> dict[str, Any]:
+        """Header of the disk copy; the key is left out as it holds request headers."""
+        return {
+            "url": self.url, "encoding": self.encoding,
+            "etag": self.etag, "last_modified": self.last_modified,
+            "expires": self.expires,
+        }
+
+
+def freshness(headers: Mapping[str, str]) -> float | None:
+    """Seconds a response may be reused without revalidation.
+
+    None means it must not be stored at all (``no-store``, ``private``,
+    ``Vary: *``).
+    """
+    directives = {
+        name.lower(): value
+        for name, value in _DIRECTIVE.findall(headers.get("cache-control", ""))
+    }
+    if ("no-store" in directives or "private" in directives
+            or headers.get("vary", "").strip() == "*"):
+        return None
+    if "no-cache" in directives:
+        return 0.0
+    if "max-age" in directives:
+        try:
+            max_age = float(directives["max-age"])
+        except ValueError:
+            return 0.0
+        try:
+            age = float(headers.get("age", "0"))
+        except ValueError:
+            age = 0.0
+        return max(0.0, max_age - age)
+    if "expires" in headers:
+        try:
+            expires = email.utils.parsedate_to_datetime(headers["expires"]).timestamp()
+            date = (email.utils.parsedate_to_datetime(headers["date"]).timestamp()
+                    if "date" in headers else time.time())
+        except (TypeError, ValueError):
+            return 0.0  # invalid Expires means "already expired"
+        return max(0.0, expires - date)
+    return PAGE_CACHE_TTL
+
+
+def cache_key(url: str, headers: Mapping[str, str] | None = None, kind: str = "page") -> str:
+    """Key of *url* fetched with *headers*; *kind* separates partial bodies."""
+    parts = [kind, url]
+    if headers:
+        parts += [f"{name.lower()}:{value}" for name, value in sorted(headers.items())]
+    return "\n".join(parts)
+
+
+def has_credentials(headers: Mapping[str, str] | None) -> bool:
+    """Whether *headers* authenticate the request, making its response private."""
+    return any(name.lower() in _CREDENTIAL_HEADERS for name in headers or ())
+
+
+class PageCache:
+    """Thread-safe LRU of `CachedPage` entries with an optional disk tier.
+
+    The memory tier holds at most *maxbytes* of page bodies in total, the
+    disk tier at most *diskbytes* of files.
+    """
+
+    def __init__(self, maxbytes: int = PAGE_CACHE_BYTES, directory: str = PAGE_CACHE_DIR,
+                 diskbytes: int = PAGE_CACHE_DISK_BYTES):
+        self.maxbytes = maxbytes
+        self.directory = directory
+        self.diskbytes = diskbytes
+        self._entries: OrderedDict[str, CachedPage] = OrderedDict()
+        self._size = 0
+        # bytes this process believes the disk tier holds; None until scanned
+        self._disk_size: int | None = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _digest(key: str) -> str:
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, self._digest(key))
+
+    def get(self, key: str) -> CachedPage | None:
+        with self._lock:
+            page = self._entries.get(key)
+            if page is not None:
+                self._entries.move_to_end(key)
+                return page
+        page = self._read(key)
+        if page is not None:
+            self._remember(page)
+        return page
+
+    def put(self, page: CachedPage) -> None:
+        self._remember(page)
+        self._write(page)
+
+    def touch(self, page: CachedPage) -> None:
+        """Persist new validators/expiry of *page* after a revalidation."""
+        self._write(page)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remember(self, page: CachedPage) -> None:
+        if len(page.content) > self.maxbytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(page.key, None)
+            if previous is not None:
+                self._size -= len(previous.content)
+            self._entries[page.key] = page
+            self._size += len(page.content)
+            while self._size > self.maxbytes:
+                _key, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.content)
+
+    def _read(self, key: str) -> CachedPage | None:
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fh:
+                header, _, content = fh.read().partition(b"\n")
+            meta = orjson.loads(header)
+        except (OSError, ValueError):
+            return None
+        if meta.get("digest") != self._digest(key):  # foreign or old-format file
+            return None
+        try:
+            os.utime(path)  # recently used files are pruned last
+        except OSError:
+            pass
+        return CachedPage(key, meta["url"], content, meta["encoding"],
+                          meta.get("etag"), meta.get("last_modified"), meta.get("expires", 0.0))
+
+    def _write(self, page: CachedPage) -> None:
+        """Store *page* as one file: a JSON header line, then the body."""
+        if not self.directory:
+            return
+        digest = self._digest(page.key)
+        header = orjson.dumps({"digest": digest, **page.meta()}) + b"\n"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    fh.write(header)
+                    fh.write(page.content)
+                os.replace(tmp, os.path.join(self.directory, digest))
+            except BaseException:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+                raise
+        except OSError:
+            return  # the disk tier is best effort
+        with self._lock:
+            if self._disk_size is not None:
+                # overcounts replaced files; the next prune rescans anyway
+                self._disk_size += len(header) + len(page.content)
+            over = self._disk_size is None or self._disk_size > self.diskbytes
+        if over:
+            self._prune()
+
+    def _prune(self) -> None:
+        """Delete the least recently used files until the disk tier fits its budget."""
+        files = []
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and not entry.name.startswith(".tmp-"):
+                        stat = entry.stat()
+                        files.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            return
+        total = sum(size for _mtime, size, _path in files)
+        files.sort()
+        for _mtime, size, path in files:
+            if total <= self.diskbytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue  # already removed by another process
+            total -= size
+        with self._lock:
+            self._disk_size = total
+
+
+page_cache = PageCache()
+
+
+def _conditional_headers(page: CachedPage | None, headers: Mapping[str, str] | None) -> dict[str, str]:
+    request_headers = dict(headers or {})
+    if page is not None:
+        if page.etag:
+            request_headers["If-None-Match"] = page.etag
+        if page.last_modified:
+            request_headers["If-Modified-Since"] = page.last_modified
+    return request_headers
+
+
+def _revalidated(page: CachedPage, response: httpx.Response, cache: PageCache) -> CachedPage:
+    """Refresh *page* from a 304 *response* and return it."""
+    ttl = freshness(response.headers)
+    page.expires = time.time() + (ttl or 0.0)
+    page.etag = response.headers.get("etag", page.etag)
+    page.last_modified = response.headers.get("last-modified", page.last_modified)
+    cache.touch(page)
+    return page
+
+
+def _store(key: str, url: str, response: httpx.Response, content: bytes,
+           cache: PageCache | None) -> CachedPage:
+    """Wrap a fetched body, keeping it in *cache* when its headers allow."""
+    headers = response.headers
+    ttl = freshness(headers)
+    page = CachedPage(
+        key, url, content, response.charset_encoding or "utf-8",
+        headers.get("etag"), headers.get("last-modified"),
+        time.time() + (ttl or 0.0),
+    )
+    cacheable = (
+        cache is not None
+        and response.status_code == 200
+        and ttl is not None
+        and (ttl > 0 or page.etag or page.last_modified)
+        and len(content) <= PAGE_CACHE_MAX_BYTES
+    )
+    if cacheable:
+        cache.put(page)
+    return page
+
+
+def fetch_page(url: str, headers: Mapping[str, str] | None = None,
+               cache: PageCache | None = page_cache) -> CachedPage:
+    """GET *url* through the cache (pass ``cache=None`` to bypass it).
+
+    A fresh entry is returned without a request, a stale one is revalidated.
+    Requests with credentials (`Authorization`, `Cookie`) are never cached.
+    Non-2xx responses raise `httpx.HTTPStatusError`.
+    """
+    if has_credentials(headers):
+        cache = None
+    key = cache_key(url, headers)
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None and cached.is_fresh():
+        return cached
+    response = get_client().get(url, headers=_conditional_headers(cached, headers))
+    if cached is not None and response.status_code == 304:
+        return _revalidated(cached, response, cache)
+    response.raise_for_status()
+    return _store(key, url, response, response.content, cache)
+
+
+async def fetch_head_async(url: str, stop: re.Pattern, max_bytes: int,
+                           timeout: float = 10,
+                           cache: PageCache | None = page_cache) -> CachedPage:
+    """Async GET of the start of *url*, through the cache.
+
+    The body is streamed until *stop* matches or *max_bytes* have arrived;
+    only that prefix is read and cached, under its own key. Non-2xx responses
+    raise `httpx.HTTPStatusError`.
+    """
+    key = cache_key(url, kind=f"head:{max_bytes}")
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None and cached.is_fresh():
+        return cached
+    head = bytearray()
+    async with get_async_client().stream(
+        "GET", url, headers=_conditional_headers(cached, None), timeout=timeout,
+    ) as response:
+        if cached is not None and response.status_code == 304:
+            return _revalidated(cached, response, cache)
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes():
+            # rescan a few bytes back in case a closing tag straddles chunks
+            start = max(0, len(head) - 16)
+            head += chunk[:max_bytes - len(head)]
+            if len(head) >= max_bytes or stop.search(head, start):
+                break
+    return _store(key, url, response, bytes(head), cache)
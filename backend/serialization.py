@@ -0,0 +1,175 @@
+"""Response encoding shared by the API and the MCP server.
+
+Payloads are serialised with orjson, and the encoded (optionally compressed)
+bytes are kept in a small LRU keyed by the caller — typically the snapshot
+version plus the slice requested — so asking for the same companies again
+skips both serialisation and compression.
+"""
+
+from __future__ import annotations
+
+import gzip
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+import orjson
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+
+try:  # optional: `pip install brotli` enables `Content-Encoding: br`
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+# bodies smaller than this are sent uncompressed
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+# total bytes of encoded payloads kept by `payload_cache`
+PAYLOAD_CACHE_BYTES = int(os.getenv("PAYLOAD_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialise *obj* to compact JSON bytes (unknown types via ``str``)."""
+    return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str:
+    """Pick ``br``, ``gzip`` or ``identity`` from an Accept-Encoding header."""
+    accepted: dict[str, float] = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+
+    wildcard = accepted.get("*", 0.0)
+    if brotli is not None and accepted.get("br", wildcard) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return "identity"
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress *body* with *encoding* (``identity`` returns it unchanged)."""
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    return body
+
+
+class PayloadCache:
+    """Thread-safe LRU of encoded payloads, one entry per key and encoding.
+
+    The cache holds at most *maxbytes* of payloads in total; a payload larger
+    than that on its own is returned without being cached.
+    """
+
+    def __init__(self, maxbytes: int = PAYLOAD_CACHE_BYTES):
+        self.maxbytes = maxbytes
+        self._entries: OrderedDict[tuple[Hashable, str], bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, encoding: str, build: Callable[[], bytes]) -> bytes:
+        """Return cached bytes for (*key*, *encoding*), building them on a miss."""
+        entry = (key, encoding)
+        with self._lock:
+            body = self._entries.get(entry)
+            if body is not None:
+                self._entries.move_to_end(entry)
+                return body
+
+        body = build()
+        if len(body) > self.maxbytes:
+            return body
+        with self._lock:
+            previous = self._entries.pop(entry, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[entry] = body
+            self._size += len(body)
+            while self._size > self.maxbytes:
+                _key, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+        return body
+
+    def peek(self, key: Hashable, encoding: str) -> bytes | None:
+        """Return cached bytes for (*key*, *encoding*) without building them."""
+        entry = (key, encoding)
+        with self._lock:
+            body = self._entries.get(entry)
+            if body is not None:
+                self._entries.move_to_end(entry)
+            return body
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+payload_cache = PayloadCache()
+
+
+def encode_payload(key: Hashable | None, build: Callable[[], Any]) -> bytes:
+    """JSON-encode ``build()``, reusing cached bytes for *key*.
+
+    Pass ``key=None`` for one-off payloads that should not be cached.
+    """
+    if key is None:
+        return dumps(build())
+    return payload_cache.get(key, "identity", lambda: dumps(build()))
+
+
+def _encode_body(key: Hashable | None, build: Callable[[], Any], encoding: str) -> tuple[bytes, str]:
+    """Encode ``build()`` and compress it with *encoding* if it is large enough."""
+    body = encode_payload(key, build)
+    if encoding == "identity" or len(body) < COMPRESS_MIN_BYTES:
+        return body, "identity"
+    plain = body
+    body = (compress(plain, encoding) if key is None
+            else payload_cache.get(key, encoding, lambda: compress(plain, encoding)))
+    return body, encoding
+
+
+async def json_response(
+    accept_encoding: str | None,
+    key: Hashable | None,
+    build: Callable[[], Any],
+    media_type: str = "application/json",
+) -> Response:
+    """Build a JSON response negotiated against *accept_encoding*.
+
+    Bodies under `COMPRESS_MIN_BYTES` go out uncompressed; compressed bodies
+    are cached next to the plain ones. Cached bytes are served straight from
+    the event loop, while serialising and compressing a new body run in the
+    threadpool. Responses carry `Content-Encoding` themselves, so the app's
+    GZip middleware passes them through untouched.
+    """
+    encoding = negotiate_encoding(accept_encoding)
+    body = None
+    if key is not None:
+        body = payload_cache.peek(key, encoding)
+        if body is None and encoding != "identity":
+            plain = payload_cache.peek(key, "identity")
+            if plain is not None and len(plain) < COMPRESS_MIN_BYTES:
+                body, encoding = plain, "identity"
+    if body is None:
+        body, encoding = await run_in_threadpool(_encode_body, key, build, encoding)
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -0,0 +1,128 @@
+"""On-disk store for fetched YC snapshots.
+
+Each category is kept in `YC_SNAPSHOT_DIR` as ``<category>.<version>.json``
+with the companies (compact orjson) plus ``<category>.meta.json`` with the
+version and HTTP validators. The data file is named after its version and
+the metadata is what points at it, so even when processes write at the same
+time a reader only ever pairs a version with its own companies. Files are
+replaced atomically, so a process starting later — another MCP stdio
+server, another uvicorn worker — can load the last good snapshot in
+milliseconds instead of waiting on the upstream.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import re
+import tempfile
+from typing import Any
+
+import orjson
+
+ROOT = os.path.abspath(os.path.dirname(__file__))
+
+# set to an empty string to disable the on-disk store
+YC_SNAPSHOT_DIR = os.getenv("YC_SNAPSHOT_DIR", os.path.join(ROOT, ".yc_cache"))
+
+
+_VERSION = re.compile(r"[\w-]+")
+
+
+def _meta_path(category: str, directory: str) -> str:
+    return os.path.join(directory, f"{category}.meta.json")
+
+
+def _data_path(category: str, version: Any, directory: str) -> str | None:
+    """Data file of *version*, or None if *version* cannot name a file."""
+    if not isinstance(version, str) or not _VERSION.fullmatch(version):
+        return None
+    return os.path.join(directory, f"{category}.{version}.json")
+
+
+def _remove_old_versions(category: str, keep: str, directory: str) -> None:
+    """Delete the data files of *category* other than *keep*."""
+    prefix = f"{category}."
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+    for name in names:
+        version = name[len(prefix):-len(".json")]
+        path = os.path.join(directory, name)
+        if (name.startswith(prefix) and name.endswith(".json") and version != "meta"
+                and _VERSION.fullmatch(version) and path != keep):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass  # another writer got there first
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """Write *data* to *path* via a temp file + rename."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def write(category: str, companies: list[dict], meta: dict[str, Any],
+          directory: str | None = None) -> None:
+    """Persist *companies* and *meta* for *category*.
+
+    The companies go to the data file of ``meta["version"]`` before the
+    metadata points at it; data files of older versions are removed after.
+    """
+    directory = YC_SNAPSHOT_DIR if directory is None else directory
+    if not directory:
+        return
+    data_path = _data_path(category, meta.get("version"), directory)
+    if data_path is None:
+        raise ValueError(f"Snapshot version {meta.get('version')!r} cannot name a file")
+    os.makedirs(directory, exist_ok=True)
+    _write_atomic(data_path, orjson.dumps(companies))
+    _write_atomic(_meta_path(category, directory), orjson.dumps(meta))
+    _remove_old_versions(category, data_path, directory)
+
+
+def write_meta(category: str, meta: dict[str, Any], directory: str | None = None) -> None:
+    """Update only the metadata of *category* (e.g. after a 304).
+
+    Nothing is written unless the data file of ``meta["version"]`` is stored.
+    """
+    directory = YC_SNAPSHOT_DIR if directory is None else directory
+    if not directory:
+        return
+    data_path = _data_path(category, meta.get("version"), directory)
+    if data_path is not None and os.path.exists(data_path):
+        _write_atomic(_meta_path(category, directory), orjson.dumps(meta))
+
+
+def read(category: str, directory: str | None = None) -> tuple[list[dict], dict[str, Any]] | None:
+    """Return (companies, meta) for *category*, or None if nothing usable is stored."""
+    directory = YC_SNAPSHOT_DIR if directory is None else directory
+    if not directory:
+        return None
+    try:
+        with open(_meta_path(category, directory), "rb") as fh:
+            meta = orjson.loads(fh.read())
+        data_path = _data_path(category, meta.get("version"), directory) if isinstance(meta, dict) else None
+        if data_path is None:
+            return None
+        # decode straight from the page cache, without an intermediate copy
+        with open(data_path, "rb") as fh, \
+                mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+                memoryview(mm) as view:
+            companies = orjson.loads(view)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(companies, list):
+        return None
+    return companies, meta
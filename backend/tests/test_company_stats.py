@@ -0,0 +1,40 @@
+"""`CompanyStats.updated` matches counting the new snapshot from scratch."""
+
+from yc_index import STATS_DIMENSIONS, CompanyStats
+
+OLD = [
+    {"id": 1, "batch": "Winter 2024", "industries": ["B2B"], "status": "Active",
+     "regions": ["Europe"], "team_size": 5, "isHiring": True},
+    {"id": 2, "batch": "Winter 2024", "industry": "Fintech", "status": "Active", "team_size": 40},
+    {"id": 3, "batch": "Summer 2023", "industries": ["B2B", "AI"], "status": "Inactive",
+     "regions": ["America / Canada"], "team_size": 300},
+    {"id": 4, "name": "No batch", "team_size": None},
+]
+
+NEW = [
+    OLD[0],
+    # changed batch, hiring flag and team-size bucket
+    {**OLD[1], "batch": "Summer 2023", "isHiring": True, "team_size": 60},
+    # id 3 removed, id 5 added
+    {"id": 5, "batch": "Spring 2025", "industries": ["AI"], "status": "Active", "team_size": 2},
+    OLD[3],
+]
+
+
+def _views(stats):
+    return [stats.view(dim) for dim in (None, *STATS_DIMENSIONS)]
+
+
+def test_updated_equals_a_full_recount():
+    assert _views(CompanyStats(OLD).updated(OLD, NEW)) == _views(CompanyStats(NEW))
+
+
+def test_updated_drops_emptied_groups():
+    stats = CompanyStats(OLD).updated(OLD, NEW)
+    assert "Inactive" not in stats.counts["status"]
+    assert set(stats.batches) == {"Winter 2024", "Summer 2023", "Spring 2025", "Unknown"}
+
+
+def test_duplicate_ids_fall_back_to_a_recount():
+    old = OLD + [{**OLD[0], "name": "Duplicate"}]
+    assert _views(CompanyStats(old).updated(old, NEW)) == _views(CompanyStats(NEW))
@@ -0,0 +1,57 @@
+"""Every installed parser backend extracts the same data."""
+
+import pytest
+
+from html_parsers import available_parsers, get_backend, parse_title
+from openScrape import ScrapingConfig, SelectorPlan, WebScraper
+
+PAGE = """<!doctype html>
+<html lang="en"><head><title> Catalogue </title></head>
+<body>
+  <div class="card" data-id="1">
+    <h2 class="name">Alpha <b>Labs</b></h2>
+    <a href="/alpha" class="link">Alpha</a>
+    <div class="card" data-id="1a"><span class="name">Nested</span></div>
+  </div>
+  <div class="card" data-id="2">
+    <h2 class="name">Beta</h2>
+    <a href="/beta" class="link btn">Beta</a><a href="/beta/more">More</a>
+    <img src="/beta.png" alt="">
+  </div>
+  <a class="next" href="?page=2">Next</a>
+</body></html>"""
+
+SELECTORS = [
+    {"container": ".card", "name": ".card", "url": "a::href"},
+    {"container": ".card", "name": "h2.name", "url": "a::href", "image": "img::src", "id": "div::data-id"},
+    {"container": "div.card", "class": "a::class", "text": "b"},
+    {"lang": "html::lang", "title": "title", "links": "a::href"},
+    {"body": "body"},
+]
+
+
+def _extract(parser, selectors):
+    backend = get_backend(parser)
+    config = ScrapingConfig(url="https://example.com", selectors=selectors,
+                            pagination={"selector": "a.next"})
+    plan = SelectorPlan.for_config(config, backend)
+    document = backend.parse(PAGE)
+    next_links = [backend.attr(element, plan.next_attr) for element in plan.next_link(document)]
+    return WebScraper(parser)._extract_data(document, plan), next_links
+
+
+@pytest.mark.parametrize("parser", available_parsers())
+@pytest.mark.parametrize("selectors", SELECTORS)
+def test_backends_extract_the_same_data(parser, selectors):
+    assert _extract(parser, selectors) == _extract("html.parser", selectors)
+
+
+def test_container_does_not_match_itself():
+    for parser in available_parsers():
+        data, _ = _extract(parser, SELECTORS[0])
+        assert [item["name"] for item in data] == ["Nested", None, None], parser
+
+
+@pytest.mark.parametrize("parser", available_parsers())
+def test_parse_title(parser):
+    assert parse_title(PAGE, parser) == "Catalogue"
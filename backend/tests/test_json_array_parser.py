@@ -0,0 +1,39 @@
+"""`iter_json_array` yields the same elements however the bytes are split."""
+
+import json
+
+import pytest
+
+from helpers import iter_json_array
+
+DOCUMENT = json.dumps(
+    [2.5, -1e-3, 10, 0, {"id": 1, "name": "Ünïcode"}, "text", [1, [2]], True, None, 123456]
+).encode()
+
+
+def _split(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 8, len(DOCUMENT)])
+def test_any_chunking_gives_the_same_elements(size):
+    assert list(iter_json_array(_split(DOCUMENT, size))) == json.loads(DOCUMENT)
+
+
+@pytest.mark.parametrize("chunks", [
+    [b"[2.", b"5]"],
+    [b"[2", b"e", b"3, 1]"],
+    [b"[-", b"1.5 ", b" ]"],
+])
+def test_numbers_cut_by_a_chunk_boundary(chunks):
+    assert list(iter_json_array(chunks)) == json.loads(b"".join(chunks))
+
+
+def test_truncated_array_raises():
+    with pytest.raises(ValueError):
+        list(iter_json_array([b"[1, 2"]))
+
+
+def test_garbage_after_an_element_raises():
+    with pytest.raises(ValueError):
+        list(iter_json_array([b'[1 x, 2]']))
@@ -0,0 +1,179 @@
+"""`SingleFlight` coalescing, and `_tail_yc_refresh` over a shared refresh."""
+
+import asyncio
+import threading
+
+import pytest
+
+import helpers
+from helpers import SingleFlight, YCSnapshot, _feed_extend, _publish_yc_feed, _tail_yc_refresh
+
+
+class CountingFlight(SingleFlight):
+    """SingleFlight that reports every caller joining a flight."""
+
+    def __init__(self):
+        super().__init__()
+        self.joined = threading.Semaphore(0)
+
+    def _join(self, key):
+        flight = super()._join(key)
+        self.joined.release()
+        return flight
+
+    def wait_joined(self, callers):
+        for _ in range(callers):
+            assert self.joined.acquire(timeout=5)
+
+
+def test_threads_share_one_call():
+    flight = CountingFlight()
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        release.wait(5)
+        return "result"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", work))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    flight.wait_joined(4)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == ["result"] * 4
+    assert len(calls) == 1
+
+
+def test_exception_reaches_thread_and_async_waiters():
+    flight = CountingFlight()
+    release = asyncio.Event()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await release.wait()
+        raise ValueError("upstream failed")
+
+    def sync_work():
+        raise AssertionError("the thread waiter must not run its own call")
+
+    async def main():
+        tasks = [asyncio.create_task(flight.do_async("k", work)) for _ in range(3)]
+        thread = asyncio.create_task(asyncio.to_thread(flight.do, "k", sync_work))
+        await asyncio.to_thread(flight.wait_joined, 4)
+        release.set()
+        return await asyncio.gather(*tasks, thread, return_exceptions=True)
+
+    outcomes = asyncio.run(main())
+    assert [type(outcome) for outcome in outcomes] == [ValueError] * 4
+    assert len(calls) == 1
+
+
+def test_waiter_takes_over_from_cancelled_leader():
+    flight = CountingFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        if len(calls) == 1:
+            await asyncio.Event().wait()  # the leader never finishes on its own
+        return "result"
+
+    async def main():
+        leader = asyncio.create_task(flight.do_async("k", work))
+        waiter = asyncio.create_task(flight.do_async("k", work))
+        await asyncio.to_thread(flight.wait_joined, 2)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+
+    assert asyncio.run(main()) == "result"
+    assert len(calls) == 2
+
+
+def test_thread_waiter_takes_over_from_cancelled_leader():
+    flight = CountingFlight()
+
+    async def work():
+        await asyncio.Event().wait()
+
+    async def main():
+        leader = asyncio.create_task(flight.do_async("k", work))
+        waiter = asyncio.create_task(asyncio.to_thread(flight.do, "k", lambda: "result"))
+        await asyncio.to_thread(flight.wait_joined, 2)
+        leader.cancel()
+        return await waiter
+
+    assert asyncio.run(main()) == "result"
+
+
+def test_same_thread_caller_does_not_wait_for_its_own_loop():
+    flight = CountingFlight()
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return "shared"
+
+    async def main():
+        leader = asyncio.create_task(flight.do_async("k", work))
+        await asyncio.to_thread(flight.wait_joined, 1)
+        # blocking here would stall the loop the leader needs to finish
+        direct = flight.do("k", lambda: "direct")
+        release.set()
+        return direct, await leader
+
+    assert asyncio.run(main()) == ("direct", "shared")
+
+
+def _refresh(key, companies, complete, stale, consumed):
+    """Stand-in for `get_yc_snapshot`: publish *companies*, then fall back to *stale*."""
+
+    def get_yc_snapshot(_category):
+        with _publish_yc_feed(key) as feed:
+            _feed_extend(feed, companies)
+            consumed.wait(5)
+            feed.complete = complete
+        return stale
+
+    return get_yc_snapshot
+
+
+def _stale(key):
+    return YCSnapshot(category=key, url="https://example.com", companies=[{"id": 9}], version="stale")
+
+
+def test_tail_yields_a_complete_feed_once(monkeypatch):
+    consumed = threading.Event()
+    companies = [{"id": 1}, {"id": 2}]
+    monkeypatch.setattr(helpers, "get_yc_snapshot",
+                        _refresh("tail-complete", companies, True, _stale("tail-complete"), consumed))
+    rows = _tail_yc_refresh("tail-complete", "all")
+    assert next(rows) == {"id": 1}
+    consumed.set()
+    assert list(rows) == [{"id": 2}]
+
+
+def test_tail_fails_when_the_feed_ends_early(monkeypatch):
+    consumed = threading.Event()
+    monkeypatch.setattr(helpers, "get_yc_snapshot",
+                        _refresh("tail-partial", [{"id": 1}, {"id": 2}], False, _stale("tail-partial"), consumed))
+    rows = _tail_yc_refresh("tail-partial", "all")
+    assert next(rows) == {"id": 1}
+    consumed.set()
+    assert next(rows) == {"id": 2}
+    with pytest.raises(RuntimeError, match="ended before it was complete"):
+        next(rows)
+
+
+def test_tail_replays_the_fallback_when_nothing_was_sent(monkeypatch):
+    consumed = threading.Event()
+    consumed.set()
+    monkeypatch.setattr(helpers, "get_yc_snapshot",
+                        _refresh("tail-empty", [], False, _stale("tail-empty"), consumed))
+    assert list(_tail_yc_refresh("tail-empty", "all")) == [{"id": 9}]
@@ -0,0 +1,88 @@
+"""`sync_companies` counts against an in-memory stand-in for psycopg2."""
+
+import csv
+
+import helpers
+from helpers import company_hash, sync_companies
+
+COMPANIES = [
+    {"id": 1, "name": "Alpha", "batch": "Winter 2024", "tags": ["AI"], "industries": ["B2B"]},
+    {"id": 2, "name": "Beta", "batch": "Summer 2023", "regions": ["Europe"]},
+]
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self._result = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.conn.statements.append(sql)
+        if sql.startswith("SELECT id, content_hash"):
+            self._result = [(cid, h, deleted) for cid, (h, deleted) in self.conn.stored.items()]
+        elif "RETURNING" in sql:
+            self._result = [(cid not in self.conn.stored,) for cid in self.conn.copied]
+        else:
+            self._result = []
+
+    def copy_expert(self, sql, buf):
+        self.conn.copied += [int(row[0]) for row in csv.reader(buf)]
+
+    def fetchall(self):
+        return self._result
+
+
+class FakeConnection:
+    dsn = "fake-sync-companies"
+
+    def __init__(self, stored):
+        self.stored = stored
+        self.statements = []
+        self.copied = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def _sync(stored, companies=COMPANIES):
+    helpers._ensured_databases.add(FakeConnection.dsn)
+    conn = FakeConnection(stored)
+    return conn, sync_companies(conn, companies)
+
+
+def test_unchanged_feed_changes_nothing():
+    stored = {item["id"]: (company_hash(item), False) for item in COMPANIES}
+    conn, counts = _sync(stored)
+    assert counts == {"added": 0, "changed": 0, "unchanged": 2, "removed": 0, "failed": 0}
+    assert conn.copied == []
+
+
+def test_new_changed_and_missing_rows_are_counted():
+    stored = {
+        1: (company_hash(COMPANIES[0]), False),
+        2: ("outdated", False),
+        3: (company_hash({"id": 3}), False),
+    }
+    conn, counts = _sync(stored, COMPANIES + [{"id": 4, "name": "Delta"}])
+    assert counts == {"added": 1, "changed": 1, "unchanged": 1, "removed": 1, "failed": 0}
+    assert sorted(conn.copied) == [2, 4]
+
+
+def test_invalid_company_is_not_deleted():
+    stored = {item["id"]: (company_hash(item), False) for item in COMPANIES}
+    stored[5] = ("stored", False)
+    conn, counts = _sync(stored, COMPANIES + [{"id": 5, "name": None}])
+    assert counts == {"added": 0, "changed": 0, "unchanged": 2, "removed": 0, "failed": 1}
+    assert not any(sql.startswith("UPDATE yc_companies SET deleted_at") for sql in conn.statements)
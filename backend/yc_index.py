@@ -0,0 +1,542 @@
+"""In-memory indexes over a YC companies snapshot.
+
+Everything here is pure Python over the list of company dicts returned by
+`helpers.get_yc_companies`; the structures are built once per snapshot
+version (see `helpers.YCSnapshot.derive`) and are read-only afterwards.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from collections import Counter, OrderedDict
+from typing import Any, Iterable
+
+
+def batch_slug(batch: str) -> str:
+    """Normalize a batch name to its slug ('Summer 2015' -> 'summer-2015')."""
+    return "-".join(batch.strip().lower().replace("-", " ").split())
+
+
+_SEASONS = {"winter": 0, "spring": 1, "summer": 2, "fall": 3}
+
+
+def _batch_order(name: str) -> tuple:
+    """Chronological sort key for 'Season YYYY' names; anything else sorts last."""
+    parts = name.lower().split()
+    if len(parts) == 2 and parts[0] in _SEASONS and parts[1].isdigit():
+        return (0, int(parts[1]), _SEASONS[parts[0]], name)
+    return (1, 0, 0, name)
+
+
+class BatchIndex:
+    """Batch -> companies partition answering lookups in O(1).
+
+    Both the human form used by the feed (``"Summer 2015"``) and the slug
+    form used by the MCP resources (``"summer-2015"``) hit the same bucket.
+    Other spellings are normalized once and remembered.
+    """
+
+    def __init__(self, companies: list[dict]):
+        self._by_slug: dict[str, list[dict]] = {}
+        self._names: dict[str, str] = {}
+        for company in companies:
+            name = company.get("batch")
+            if not name:
+                continue
+            slug = batch_slug(name)
+            self._by_slug.setdefault(slug, []).append(company)
+            self._names.setdefault(slug, name)
+
+        self._catalogue: list[tuple[str, str, int]] | None = None
+
+        # alias -> slug; seeded with both canonical spellings of every batch
+        self._aliases: dict[str, str] = {}
+        for slug, name in self._names.items():
+            self._aliases[slug] = slug
+            self._aliases[name] = slug
+
+    def resolve(self, batch: str) -> str | None:
+        """Return the slug for *batch*, or None if the snapshot has no such batch."""
+        slug = self._aliases.get(batch)
+        if slug is None:
+            slug = batch_slug(batch)
+            if slug not in self._by_slug:
+                return None
+            self._aliases[batch] = slug
+        return slug
+
+    def get(self, batch: str) -> list[dict]:
+        """Return companies of *batch* (empty list when unknown)."""
+        slug = self.resolve(batch)
+        return self._by_slug[slug] if slug is not None else []
+
+    def __contains__(self, batch: str) -> bool:
+        return self.resolve(batch) is not None
+
+    def __len__(self) -> int:
+        return len(self._by_slug)
+
+    def name(self, batch: str) -> str | None:
+        """Return the feed's human-readable name for *batch*."""
+        slug = self.resolve(batch)
+        return self._names[slug] if slug is not None else None
+
+    def slugs(self) -> list[str]:
+        """All batch slugs present in the snapshot."""
+        return list(self._by_slug)
+
+    def catalogue(self) -> list[tuple[str, str, int]]:
+        """(slug, name, company count) of every batch, oldest first."""
+        if self._catalogue is None:
+            self._catalogue = sorted(
+                ((slug, self._names[slug], len(companies))
+                 for slug, companies in self._by_slug.items()),
+                key=lambda entry: _batch_order(entry[1]),
+            )
+        return self._catalogue
+
+
+# company dict key(s) feeding each filterable field
+INDEXED_FIELDS: dict[str, tuple[str, ...]] = {
+    "industry": ("industry", "industries"),
+    "status": ("status",),
+    "region": ("regions",),
+    "tag": ("tags",),
+}
+
+
+# filter values whose posting sets `CompanyIndex.match` remembers, per index
+MATCH_CACHE_SIZE = 1024
+
+
+def _team_size(company: dict) -> int:
+    size = company.get("team_size")
+    return size if isinstance(size, int) else 0
+
+
+class CompanyIndex:
+    """Inverted indexes over a snapshot for the MCP filter tools.
+
+    Each field in `INDEXED_FIELDS` maps a lowercased value to the set of
+    company positions carrying it. Filters keep the tools' substring
+    semantics ("b2b" matches "B2B -> Supply Chain"), but the substring test
+    runs over the small per-field vocabulary, not over every company, and the
+    resulting posting sets of the last `MATCH_CACHE_SIZE` query values are
+    memoized.
+    """
+
+    def __init__(self, companies: list[dict], batches: BatchIndex | None = None):
+        self.companies = companies
+        self.batches = batches if batches is not None else BatchIndex(companies)
+        self._postings: dict[str, dict[str, set[int]]] = {f: {} for f in INDEXED_FIELDS}
+        self._batch_postings: dict[str, frozenset[int]] = {}
+        self._matches: OrderedDict[tuple[str, str], frozenset[int]] = OrderedDict()
+        self._matches_lock = threading.Lock()
+        self._text: SearchIndex | None = None
+        # team sizes normalised once; the sorted copy answers range counts by bisection
+        self._team_sizes = [_team_size(c) for c in companies]
+        self._by_team_size = sorted(range(len(companies)), key=self._team_sizes.__getitem__)
+        self._sorted_team_sizes = [self._team_sizes[i] for i in self._by_team_size]
+
+        positions = {id(c): i for i, c in enumerate(companies)}
+        for slug in self.batches.slugs():
+            self._batch_postings[slug] = frozenset(positions[id(c)] for c in self.batches.get(slug))
+
+        for pos, company in enumerate(companies):
+            for fname, keys in INDEXED_FIELDS.items():
+                postings = self._postings[fname]
+                for key in keys:
+                    value = company.get(key)
+                    if not value:
+                        continue
+                    for item in (value if isinstance(value, list) else (value,)):
+                        if isinstance(item, str) and item:
+                            postings.setdefault(item.lower(), set()).add(pos)
+
+    def __len__(self) -> int:
+        return len(self.companies)
+
+    @property
+    def text(self) -> SearchIndex:
+        """Full-text index over the same companies (built on first use)."""
+        if self._text is None:
+            self._text = SearchIndex(self.companies)
+        return self._text
+
+    def match(self, fname: str, value: str) -> frozenset[int]:
+        """Positions whose *fname* contains *value* (case-insensitive)."""
+        needle = value.lower()
+        cache_key = (fname, needle)
+        with self._matches_lock:
+            hit = self._matches.get(cache_key)
+            if hit is not None:
+                self._matches.move_to_end(cache_key)
+                return hit
+
+        postings = self._postings[fname]
+        exact = postings.get(needle)
+        result: set[int] = set(exact) if exact else set()
+        for term, ids in postings.items():
+            if needle in term and term != needle:
+                result |= ids
+        frozen = frozenset(result)
+        with self._matches_lock:
+            self._matches[cache_key] = frozen
+            if len(self._matches) > MATCH_CACHE_SIZE:
+                self._matches.popitem(last=False)
+        return frozen
+
+    def match_batch(self, batch: str) -> frozenset[int]:
+        """Positions of companies in *batch* (either spelling)."""
+        slug = self.batches.resolve(batch)
+        return self._batch_postings[slug] if slug is not None else frozenset()
+
+    def select(
+        self,
+        industry: str | None = None,
+        status: str | None = None,
+        region: str | None = None,
+        batch: str | None = None,
+        tag: str | None = None,
+        min_team_size: int | None = None,
+        limit: int | None = None,
+    ) -> list[int]:
+        """Positions matching every given filter, in snapshot order.
+
+        Every predicate's cardinality is known before any company is visited
+        (posting set sizes, a bisection over the sorted team sizes), so the
+        most selective one drives the scan and the others are checked in one
+        fused pass, stopping as soon as *limit* positions are found.
+        """
+        sets: list[frozenset[int]] = []
+        for fname, value in (("industry", industry), ("status", status),
+                             ("region", region), ("tag", tag)):
+            if value:
+                sets.append(self.match(fname, value))
+        if batch:
+            sets.append(self.match_batch(batch))
+        sets.sort(key=len)
+        if sets and not sets[0]:
+            return []
+
+        sizes = self._team_sizes
+        if min_team_size is not None:
+            start = bisect_left(self._sorted_team_sizes, min_team_size)
+            if not sets or len(self._by_team_size) - start < len(sets[0]):
+                driver = sorted(self._by_team_size[start:])
+                min_team_size = None  # satisfied by construction
+            else:
+                driver = sorted(sets.pop(0))
+        elif sets:
+            driver = sorted(sets.pop(0))
+        else:
+            driver = range(len(self.companies))
+
+        if not sets and min_team_size is None:
+            return list(driver[:limit] if limit is not None else driver)
+
+        result: list[int] = []
+        for pos in driver:
+            if min_team_size is not None and sizes[pos] < min_team_size:
+                continue
+            for other in sets:
+                if pos not in other:
+                    break
+            else:
+                result.append(pos)
+                if limit is not None and len(result) >= limit:
+                    break
+        return result
+
+    def rows(self, positions) -> list[dict]:
+        """Map positions back to company dicts."""
+        companies = self.companies
+        return [companies[i] for i in positions]
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# text fields searched by `SearchIndex` and how much a hit in each counts
+SEARCH_FIELDS: dict[str, float] = {
+    "name": 3.0,
+    "tags": 2.0,
+    "one_liner": 1.5,
+    "long_description": 1.0,
+}
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase alphanumeric tokens of *text*."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class SearchIndex:
+    """BM25-ranked full-text index over company name, tags and descriptions.
+
+    Field hits are weighted by `SEARCH_FIELDS` and folded into one term
+    frequency per company. Query terms also expand to vocabulary terms they
+    prefix ("pay" -> "payments"), at a discount, via a sorted vocabulary.
+    """
+
+    K1 = 1.2
+    B = 0.75
+    PREFIX_WEIGHT = 0.7
+    MAX_EXPANSIONS = 50
+
+    def __init__(self, companies: list[dict]):
+        self._postings: dict[str, dict[int, float]] = {}
+        self._lengths: list[float] = []
+
+        for pos, company in enumerate(companies):
+            length = 0.0
+            for fname, weight in SEARCH_FIELDS.items():
+                value = company.get(fname)
+                if not value:
+                    continue
+                text = " ".join(value) if isinstance(value, list) else str(value)
+                for token in tokenize(text):
+                    postings = self._postings.setdefault(token, {})
+                    postings[pos] = postings.get(pos, 0.0) + weight
+                    length += weight
+            self._lengths.append(length)
+
+        self._count = len(companies)
+        self._avg_length = (sum(self._lengths) / self._count) if self._count else 0.0
+        self._vocabulary = sorted(self._postings)
+        self._idf = {
+            term: math.log(1 + (self._count - len(p) + 0.5) / (len(p) + 0.5))
+            for term, p in self._postings.items()
+        }
+
+    def _expand(self, term: str, prefix: bool) -> list[tuple[str, float]]:
+        """Vocabulary terms matched by query *term* with their weight."""
+        matches: list[tuple[str, float]] = []
+        if term in self._postings:
+            matches.append((term, 1.0))
+        if prefix:
+            vocab = self._vocabulary
+            extra: list[str] = []
+            i = bisect_left(vocab, term)
+            while i < len(vocab) and vocab[i].startswith(term):
+                if vocab[i] != term:
+                    extra.append(vocab[i])
+                i += 1
+            if len(extra) > self.MAX_EXPANSIONS:
+                extra = heapq.nlargest(self.MAX_EXPANSIONS, extra,
+                                       key=lambda t: len(self._postings[t]))
+            matches.extend((t, self.PREFIX_WEIGHT) for t in extra)
+        return matches
+
+    def _term_scores(self, term: str, prefix: bool) -> dict[int, float]:
+        """BM25 contribution of one query term for every matching company."""
+        scores: dict[int, float] = {}
+        lengths, avg = self._lengths, self._avg_length or 1.0
+        k1, b = self.K1, self.B
+        for vocab_term, weight in self._expand(term, prefix):
+            idf = self._idf[vocab_term] * weight
+            for pos, tf in self._postings[vocab_term].items():
+                norm = tf + k1 * (1 - b + b * lengths[pos] / avg)
+                scores[pos] = scores.get(pos, 0.0) + idf * tf * (k1 + 1) / norm
+        return scores
+
+    def search(
+        self,
+        query: str,
+        limit: int | None = 20,
+        mode: str = "and",
+        prefix: bool = True,
+        candidates: set[int] | frozenset[int] | None = None,
+    ) -> list[tuple[int, float]]:
+        """Return up to *limit* (position, score) pairs, best first.
+
+        Args:
+            query: free text; split into terms like the indexed fields
+            limit: maximum number of hits (None for all of them)
+            mode: "and" requires every term to match, "or" any of them
+            prefix: also match vocabulary terms that start with a query term
+            candidates: optional positions to restrict the search to
+        """
+        if mode not in ("and", "or"):
+            raise ValueError(f"Unsupported search mode '{mode}'. Allowed: and, or")
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        per_term = [self._term_scores(term, prefix) for term in terms]
+        if mode == "and":
+            per_term.sort(key=len)
+            keys = set(per_term[0])
+            for scores in per_term[1:]:
+                keys &= scores.keys()
+        else:
+            keys = set().union(*per_term)
+        if candidates is not None:
+            keys &= candidates
+
+        totals = ((pos, sum(scores.get(pos, 0.0) for scores in per_term)) for pos in keys)
+        if limit is None:
+            return sorted(totals, key=lambda hit: (-hit[1], hit[0]))
+        return heapq.nsmallest(limit, totals, key=lambda hit: (-hit[1], hit[0]))
+
+
+class IdOrder:
+    """Companies sorted by ``id`` for keyset pagination.
+
+    `page(after_id, limit)` is a bisect plus a slice, so deep pages cost the
+    same as the first one.
+    """
+
+    def __init__(self, companies: list[dict]):
+        ordered = sorted(
+            (c for c in companies if isinstance(c.get("id"), int)),
+            key=lambda c: c["id"],
+        )
+        self.companies = ordered
+        self._ids = [c["id"] for c in ordered]
+
+    def __len__(self) -> int:
+        return len(self.companies)
+
+    def page(self, after_id: int | None = None, limit: int | None = None) -> list[dict]:
+        """Companies with ``id > after_id``, at most *limit* of them."""
+        start = 0 if after_id is None else bisect_right(self._ids, after_id)
+        end = len(self._ids) if limit is None else start + limit
+        return self.companies[start:end]
+
+    def has_more(self, last_id: int) -> bool:
+        """True if any company sorts after *last_id*."""
+        return bool(self._ids) and self._ids[-1] > last_id
+
+
+# (upper bound, label) of the team-size histogram buckets
+TEAM_SIZE_BUCKETS: tuple[tuple[int, str], ...] = (
+    (10, "1-10"), (50, "11-50"), (200, "51-200"), (500, "201-500"), (1000, "501-1000"),
+)
+
+STATS_DIMENSIONS = ("batch", "industry", "status", "region", "team_size")
+
+
+def team_size_bucket(size: Any) -> str:
+    """Histogram label of a team size ("unknown" when missing)."""
+    if not isinstance(size, int) or size <= 0:
+        return "unknown"
+    for upper, label in TEAM_SIZE_BUCKETS:
+        if size <= upper:
+            return label
+    return "1001+"
+
+
+def _distinct(company: dict, keys: tuple[str, ...]) -> set[str]:
+    values: set[str] = set()
+    for key in keys:
+        value = company.get(key)
+        for item in (value if isinstance(value, list) else (value,)):
+            if isinstance(item, str) and item:
+                values.add(item)
+    return values
+
+
+class CompanyStats:
+    """Group-by counts over a snapshot.
+
+    Counts per batch, industry, status, region and team-size bucket, plus
+    per-batch company, hiring and team-size totals. A new snapshot version
+    is handled by `updated`, which applies only the companies that were
+    added, removed or changed instead of recounting everything; rendered
+    views are memoized.
+    """
+
+    def __init__(self, companies: Iterable[dict] = ()):
+        self.total = 0
+        self.counts: dict[str, Counter[str]] = {dim: Counter() for dim in STATS_DIMENSIONS}
+        self.batches: dict[str, dict[str, Any]] = {}
+        self._views: dict[str | None, dict[str, Any]] = {}
+        for company in companies:
+            self._apply(company, 1)
+
+    def _apply(self, company: dict, sign: int) -> None:
+        batch = company.get("batch") or "Unknown"
+        bucket = team_size_bucket(company.get("team_size"))
+        self.total += sign
+        for dim, values in (
+            ("batch", (batch,)),
+            ("industry", _distinct(company, INDEXED_FIELDS["industry"])),
+            ("status", _distinct(company, INDEXED_FIELDS["status"])),
+            ("region", _distinct(company, INDEXED_FIELDS["region"])),
+            ("team_size", (bucket,)),
+        ):
+            counter = self.counts[dim]
+            for value in values:
+                counter[value] += sign
+                if counter[value] <= 0:
+                    del counter[value]
+
+        entry = self.batches.get(batch)
+        if entry is None:
+            entry = self.batches[batch] = {"companies": 0, "hiring": 0, "team_size": Counter()}
+        entry["companies"] += sign
+        entry["hiring"] += sign if company.get("isHiring") else 0
+        entry["team_size"][bucket] += sign
+        if entry["team_size"][bucket] <= 0:
+            del entry["team_size"][bucket]
+        if entry["companies"] <= 0:
+            del self.batches[batch]
+
+    def updated(self, old: list[dict], new: list[dict]) -> CompanyStats:
+        """Stats for *new*, derived from these stats of *old* by company id."""
+        old_by_id = {c.get("id"): c for c in old}
+        if len(old_by_id) != len(old) or None in old_by_id:
+            return CompanyStats(new)  # ids are not a usable key; recount
+
+        stats = CompanyStats()
+        stats.total = self.total
+        stats.counts = {dim: Counter(counter) for dim, counter in self.counts.items()}
+        stats.batches = {
+            name: {**entry, "team_size": Counter(entry["team_size"])}
+            for name, entry in self.batches.items()
+        }
+        for company in new:
+            previous = old_by_id.pop(company.get("id"), None)
+            if previous is None:
+                stats._apply(company, 1)
+            elif previous != company:
+                stats._apply(previous, -1)
+                stats._apply(company, 1)
+        for previous in old_by_id.values():
+            stats._apply(previous, -1)
+        return stats
+
+    def view(self, group_by: str | None = None) -> dict[str, Any]:
+        """JSON-ready counts for one dimension, or for all of them.
+
+        ``group_by="batch"`` (and the full view) include each batch's hiring
+        ratio and team-size distribution. Raises ValueError for an unknown
+        dimension.
+        """
+        if group_by is not None and group_by not in STATS_DIMENSIONS:
+            raise ValueError(f"Unknown group_by '{group_by}' (use one of {', '.join(STATS_DIMENSIONS)})")
+        view = self._views.get(group_by)
+        if view is not None:
+            return view
+
+        view = {"total": self.total}
+        for dim in STATS_DIMENSIONS if group_by is None else (group_by,):
+            if dim == "batch":
+                view["by_batch"] = {
+                    name: {
+                        "companies": entry["companies"],
+                        "hiring": entry["hiring"],
+                        "hiring_ratio": round(entry["hiring"] / entry["companies"], 4),
+                        "team_size": dict(entry["team_size"].most_common()),
+                    }
+                    for name, entry in sorted(self.batches.items(),
+                                              key=lambda item: -item[1]["companies"])
+                }
+            else:
+                view[f"by_{dim}"] = dict(self.counts[dim].most_common())
+        self._views[group_by] = view
+        return view
@@ -33,12 +33,25 @@ from __future__ import annotations
 import logging
 import os
 import sys
-from typing import Any
+from typing import Any, Callable, Sequence
 from dotenv import load_dotenv
 
 from mcp.server.fastmcp import FastMCP  # High‑level SDK interface
+from mcp.types import Resource as MCPResource
 
-from helpers import get_yc_batch_companies  # your existing helper
+from helpers import (  # your existing helpers
+    BatchIndex,
+    db_pooled_connection,
+    get_yc_batch_companies,
+    get_yc_batch_index,
+    get_yc_company_index,
+    get_yc_snapshot,
+    get_yc_snapshot_async,
+    get_yc_stats,
+    query_companies,
+)
+from serialization import dumps, encode_payload, payload_cache
+from yc_index import batch_slug
 
 # Load environment variables from .env file
 load_dotenv()
@@ -56,202 +69,298 @@ logging.basicConfig(
     stream=sys.stderr,
 )
 
+class YCServer(FastMCP):
+    """FastMCP server that also lists one resource per batch in the data."""
+
+    async def list_resources(self) -> list[MCPResource]:
+        resources = await super().list_resources()
+        try:
+            snapshot = await get_yc_snapshot_async()
+        except Exception as e:
+            logging.error(f"Error loading YC batches: {str(e)}")
+            return resources
+        return resources + [
+            MCPResource(
+                uri=f"mcp://yc/{slug}.json",
+                name=slug,
+                description=f"{count} companies from YC {name}",
+                mimeType="application/json",
+            )
+            for slug, name, count in snapshot.derive("batches", BatchIndex).catalogue()
+        ]
+
+
 # Configure the MCP server
-mcp = FastMCP(
+mcp = YCServer(
     "YC Companies Server",
     version="1.0.0",
     # Pass Claude API key to the server
     auth_token=CLAUDE_API_KEY
 )
 
-# Define available YC batches
-AVAILABLE_BATCHES = [
-    # Early batches
-    "summer-2005",
-    "winter-2006",
-    "summer-2006",
-    "winter-2007",
-    "summer-2007",
-    "winter-2008",
-    "summer-2008",
-    "winter-2009",
-    "summer-2009",
-    "winter-2010",
-    "summer-2010",
-    "winter-2011",
-    "summer-2011",
-    "winter-2012",
-    "spring-2012",
-    "summer-2012",
-    "winter-2013",
-    "summer-2013",
-    "winter-2014",
-    "summer-2014",
-    "winter-2015",
-    "summer-2015",
-    "winter-2016",
-    "summer-2016",
-    "winter-2017",
-    "summer-2017",
-    "winter-2018",
-    "summer-2018",
-    "winter-2019",
-    "summer-2019",
-    "winter-2020",
-    "summer-2020",
-    "winter-2021",
-    "summer-2021",
-    "winter-2022",
-    "summer-2022",
-    "winter-2023",
-    "summer-2023",
-    "winter-2024",
-    "summer-2024",
-    "winter-2025",
-    "summer-2025"
-]
+# Where the filter tools run: "memory" (downloaded snapshot + in-process
+# indexes) or "sql" (predicates pushed into the yc_companies table, which
+# `/yc?category=all&persist=true` keeps in sync)
+YC_QUERY_BACKEND = os.getenv("YC_QUERY_BACKEND", "memory").lower()
+# page size of the company tools when the caller does not pass `limit`
+MCP_DEFAULT_LIMIT = int(os.getenv("MCP_DEFAULT_LIMIT", "100"))
+
+
+def sql_query(**filters: Any) -> list[dict[str, Any]]:
+    """Answer a filter tool from Postgres on a pooled connection."""
+    with db_pooled_connection() as conn:
+        return query_companies(conn, **filters)
+
+
+def batch_catalogue() -> list[dict[str, Any]]:
+    """Batches present in the current snapshot with their company counts, oldest first."""
+    return [
+        {"batch": slug, "name": name, "companies": count}
+        for slug, name, count in get_yc_batch_index().catalogue()
+    ]
+
+
+def _unknown_batch(batch: str) -> str:
+    logging.error(f"Invalid batch: {batch}")
+    return dumps({"error": f"Unknown batch '{batch}'; see yc_batches for the list"}).decode()
+
+
+def page_json(
+    rows: Sequence[dict[str, Any]],
+    offset: int,
+    limit: int,
+    fields: list[str] | None = None,
+    max_bytes: int | None = None,
+    group_by: Callable[[dict[str, Any]], str] | None = None,
+) -> str:
+    """Encode one page of tool results.
+
+    *rows* start at *offset* and may hold one row past *limit*, which only
+    signals that more exist. Rows are projected to *fields* and encoded one
+    at a time until *limit* rows or *max_bytes* of results are reached (the
+    first row is always sent), so the cost follows the page, not the match
+    count. The result is ``{"results", "offset", "returned", "next_offset"}``;
+    pass ``next_offset`` back as ``offset`` to continue.
+    """
+    parts: list[tuple[str | None, bytes]] = []
+    size = 0
+    for row in rows[:limit]:
+        key = group_by(row) if group_by else None
+        if fields:
+            row = {f: row[f] for f in fields if f in row}
+        item = dumps(row)
+        if max_bytes and parts and size + len(item) + 1 > max_bytes:
+            break
+        parts.append((key, item))
+        size += len(item) + 1
+
+    if group_by is None:
+        results = b"[" + b",".join(item for _key, item in parts) + b"]"
+    else:
+        groups: dict[str, list[bytes]] = {}
+        for key, item in parts:
+            groups.setdefault(key, []).append(item)
+        results = b"{" + b",".join(
+            dumps(key) + b":[" + b",".join(items) + b"]" for key, items in groups.items()
+        ) + b"}"
+
+    returned = len(parts)
+    next_offset = offset + returned if returned < len(rows) else None
+    return (
+        b'{"results":' + results
+        + b',"offset":' + dumps(offset)
+        + b',"returned":' + dumps(returned)
+        + b',"next_offset":' + dumps(next_offset) + b"}"
+    ).decode()
+
+
+def _window(limit: int | None, offset: int | None) -> tuple[int, int]:
+    """Normalise a tool's (limit, offset) arguments.
+
+    A missing or non-positive limit means `MCP_DEFAULT_LIMIT`: an empty page
+    would hand back ``next_offset == offset`` and never advance.
+    """
+    limit = MCP_DEFAULT_LIMIT if limit is None or limit < 1 else limit
+    return limit, max(offset or 0, 0)
+
+
+def _cached_page(key: tuple, build: Callable[[], str]) -> str:
+    """Reuse an encoded page while the snapshot is unchanged."""
+    return payload_cache.get(("mcp", get_yc_snapshot().version) + key, "identity",
+                             lambda: build().encode()).decode()
+
+
+def _batch_json(batch: str) -> str:
+    """Encoded company list of *batch*, reused while the snapshot is unchanged."""
+    version = get_yc_snapshot().version
+    return encode_payload(
+        ("mcp/batch", version, batch_slug(batch)),
+        lambda: get_yc_batch_companies(batch),
+    ).decode()
+
 
 @mcp.tool()
-def yc_batch(batch: str) -> list[dict[str, Any]]:
-    """Return company list for a YC batch."""
-    return get_yc_batch_companies(batch)
+def yc_batches() -> str:
+    """Return every YC batch in the data with its number of companies."""
+    return encode_payload(("mcp/batches", get_yc_snapshot().version), batch_catalogue).decode()
 
 @mcp.tool()
-def yc_all_batches() -> dict[str, list[dict[str, Any]]]:
-    """Return company lists for all available YC batches."""
-    all_batches = {}
-    for batch_slug in AVAILABLE_BATCHES:
-        try:
-            human_name = batch_slug.replace("-", " ").title()
-            logging.info(f"Fetching YC batch → {human_name}")
-            companies = get_yc_batch_companies(human_name)
-            all_batches[batch_slug] = companies
-            logging.info(f"Successfully retrieved {len(companies)} companies for {human_name}")
-        except Exception as e:
-            logging.error(f"Error retrieving companies for {human_name}: {str(e)}")
-            all_batches[batch_slug] = []
-    return all_batches
+def yc_batch(batch: str, fields: list[str] | None = None, limit: int | None = None,
+             offset: int = 0, max_bytes: int | None = None) -> str:
+    """Return company list for a YC batch.
+
+    Args:
+        batch: Batch name (e.g., "Summer 2015" or "summer-2015")
+        fields: Optional company fields to return (e.g., ["name", "one_liner"])
+        limit: Maximum number of companies to return (default 100)
+        offset: Companies to skip; pass the previous `next_offset` to continue
+        max_bytes: Optional cap on the size of the results (~4 bytes per token)
+    """
+    index = get_yc_batch_index()
+    if batch not in index:
+        return _unknown_batch(batch)
+    limit, offset = _window(limit, offset)
+    return _cached_page(
+        ("batch", index.resolve(batch), tuple(fields or ()), limit, offset, max_bytes),
+        lambda: page_json(index.get(batch)[offset:offset + limit + 1],
+                          offset, limit, fields, max_bytes),
+    )
+
+def _all_batches_page(fields, limit, offset, max_bytes) -> str:
+    """One page of the companies of every batch, grouped by batch slug."""
+    index = get_yc_batch_index()
+    rows: list[dict[str, Any]] = []
+    slugs: dict[int, str] = {}
+    stop = offset + limit + 1
+    for slug, _name, _count in index.catalogue():
+        taken = index.get(slug)[:stop - len(rows)]
+        slugs.update((id(company), slug) for company in taken)
+        rows.extend(taken)
+        if len(rows) >= stop:
+            break
+    return page_json(rows[offset:], offset, limit, fields, max_bytes,
+                     group_by=lambda row: slugs[id(row)])
 
 @mcp.tool()
-def yc_companies_by_industry(industry: str) -> list[dict[str, Any]]:
-    """Return all YC companies in a specific industry/sector.
+def yc_all_batches(fields: list[str] | None = None, limit: int | None = None,
+                   offset: int = 0, max_bytes: int | None = None) -> str:
+    """Return company lists for all available YC batches.
+
+    Companies are counted across batches (oldest batch first) and returned
+    grouped by batch slug.
+
+    Args:
+        fields: Optional company fields to return (e.g., ["name", "one_liner"])
+        limit: Maximum number of companies to return (default 100)
+        offset: Companies to skip; pass the previous `next_offset` to continue
+        max_bytes: Optional cap on the size of the results (~4 bytes per token)
+    """
+    limit, offset = _window(limit, offset)
+    return _cached_page(
+        ("all_batches", tuple(fields or ()), limit, offset, max_bytes),
+        lambda: _all_batches_page(fields, limit, offset, max_bytes),
+    )
+
+def _filter_rows(limit: int, offset: int, **filters: Any) -> list[dict[str, Any]]:
+    """Rows from *offset* on matching *filters*, plus one to detect a next page."""
+    if YC_QUERY_BACKEND == "sql":
+        return sql_query(limit=limit + 1, offset=offset, **filters)
+    index = get_yc_company_index()
+    return index.rows(index.select(limit=offset + limit + 1, **filters)[offset:])
+
+@mcp.tool()
+def yc_companies_by_industry(industry: str, fields: list[str] | None = None,
+                             limit: int | None = None, offset: int = 0,
+                             max_bytes: int | None = None) -> str:
+    """Return YC companies in a specific industry/sector.
     
     Args:
         industry: Industry/sector to filter by (e.g., "B2B", "Consumer", "Fintech")
+        fields: Optional company fields to return (e.g., ["name", "one_liner"])
+        limit: Maximum number of companies to return (default 100)
+        offset: Companies to skip; pass the previous `next_offset` to continue
+        max_bytes: Optional cap on the size of the results (~4 bytes per token)
     """
     logging.info(f"Searching for companies in industry: {industry}")
-    matching_companies = []
-    
-    # Search through all batches
-    for batch_slug in AVAILABLE_BATCHES:
-        try:
-            human_name = batch_slug.replace("-", " ").title()
-            companies = get_yc_batch_companies(human_name)
-            
-            # Filter companies by industry
-            for company in companies:
-                # Check both the main industry field and the industries list
-                main_industry = company.get("industry", "")
-                industries_list = company.get("industries", [])
-                
-                if (industry.lower() in main_industry.lower() or 
-                    any(industry.lower() in ind.lower() for ind in industries_list)):
-                    matching_companies.append(company)
-        except Exception as e:
-            logging.error(f"Error processing batch {human_name}: {str(e)}")
-    
+    limit, offset = _window(limit, offset)
+    # matches both the main industry field and the industries list
+    matching_companies = _filter_rows(limit, offset, industry=industry)
     logging.info(f"Found {len(matching_companies)} companies in industry: {industry}")
-    return matching_companies
+    return page_json(matching_companies, offset, limit, fields, max_bytes)
 
 @mcp.tool()
-def yc_companies_by_status(status: str) -> list[dict[str, Any]]:
-    """Return all YC companies with a specific status.
+def yc_companies_by_status(status: str, fields: list[str] | None = None,
+                           limit: int | None = None, offset: int = 0,
+                           max_bytes: int | None = None) -> str:
+    """Return YC companies with a specific status.
     
     Args:
         status: Company status to filter by (e.g., "Active", "Acquired", "Inactive")
+        fields: Optional company fields to return (e.g., ["name", "one_liner"])
+        limit: Maximum number of companies to return (default 100)
+        offset: Companies to skip; pass the previous `next_offset` to continue
+        max_bytes: Optional cap on the size of the results (~4 bytes per token)
     """
     logging.info(f"Searching for companies with status: {status}")
-    matching_companies = []
-    
-    for batch_slug in AVAILABLE_BATCHES:
-        try:
-            human_name = batch_slug.replace("-", " ").title()
-            companies = get_yc_batch_companies(human_name)
-            
-            # Filter companies by status
-            for company in companies:
-                company_status = company.get("status", "")
-                if status.lower() in company_status.lower():
-                    matching_companies.append(company)
-        except Exception as e:
-            logging.error(f"Error processing batch {human_name}: {str(e)}")
-    
+    limit, offset = _window(limit, offset)
+    matching_companies = _filter_rows(limit, offset, status=status)
     logging.info(f"Found {len(matching_companies)} companies with status: {status}")
-    return matching_companies
+    return page_json(matching_companies, offset, limit, fields, max_bytes)
 
 @mcp.tool()
-def yc_companies_by_region(region: str) -> list[dict[str, Any]]:
-    """Return all YC companies in a specific region.
+def yc_companies_by_region(region: str, fields: list[str] | None = None,
+                           limit: int | None = None, offset: int = 0,
+                           max_bytes: int | None = None) -> str:
+    """Return YC companies in a specific region.
     
     Args:
         region: Region to filter by (e.g., "United States", "Europe", "Asia")
+        fields: Optional company fields to return (e.g., ["name", "one_liner"])
+        limit: Maximum number of companies to return (default 100)
+        offset: Companies to skip; pass the previous `next_offset` to continue
+        max_bytes: Optional cap on the size of the results (~4 bytes per token)
     """
     logging.info(f"Searching for companies in region: {region}")
-    matching_companies = []
-    
-    for batch_slug in AVAILABLE_BATCHES:
-        try:
-            human_name = batch_slug.replace("-", " ").title()
-            companies = get_yc_batch_companies(human_name)
-            
-            # Filter companies by region
-            for company in companies:
-                regions_list = company.get("regions", [])
-                if any(region.lower() in reg.lower() for reg in regions_list):
-                    matching_companies.append(company)
-        except Exception as e:
-            logging.error(f"Error processing batch {human_name}: {str(e)}")
-    
+    limit, offset = _window(limit, offset)
+    matching_companies = _filter_rows(limit, offset, region=region)
     logging.info(f"Found {len(matching_companies)} companies in region: {region}")
-    return matching_companies
+    return page_json(matching_companies, offset, limit, fields, max_bytes)
 
 @mcp.tool()
-def yc_search_companies(query: str) -> list[dict[str, Any]]:
+def yc_search_companies(query: str, limit: int = 50, mode: str = "and",
+                        fields: list[str] | None = None, offset: int = 0,
+                        max_bytes: int | None = None) -> str:
     """Search for YC companies by name, description, or tags.
+
+    Results are ranked by relevance (BM25); terms also match as prefixes,
+    so "pay" finds "payments".
     
     Args:
-        query: Search term to look for in company name, description, or tags
+        query: Search terms to look for in company name, description, or tags
+        limit: Maximum number of companies to return (best matches first)
+        mode: "and" to require every term, "or" to match any of them
+        fields: Optional company fields to return (e.g., ["name", "one_liner"])
+        offset: Companies to skip; pass the previous `next_offset` to continue
+        max_bytes: Optional cap on the size of the results (~4 bytes per token)
     """
     logging.info(f"Searching for companies matching query: {query}")
-    matching_companies = []
-    
-    for batch_slug in AVAILABLE_BATCHES:
-        try:
-            human_name = batch_slug.replace("-", " ").title()
-            companies = get_yc_batch_companies(human_name)
-            
-            # Search companies by name, description, or tags
-            for company in companies:
-                name = company.get("name", "")
-                one_liner = company.get("one_liner", "")
-                description = company.get("long_description", "")
-                tags = company.get("tags", [])
-                
-                if (query.lower() in name.lower() or
-                    query.lower() in one_liner.lower() or
-                    query.lower() in description.lower() or
-                    any(query.lower() in tag.lower() for tag in tags)):
-                    matching_companies.append(company)
-        except Exception as e:
-            logging.error(f"Error processing batch {human_name}: {str(e)}")
-    
+    limit, offset = _window(limit, offset)
+    if YC_QUERY_BACKEND == "sql":
+        # substring match in id order; BM25 ranking is memory-backend only
+        matching_companies = sql_query(query=query, limit=limit + 1, offset=offset)
+    else:
+        index = get_yc_company_index()
+        hits = index.text.search(query, limit=offset + limit + 1, mode=mode)
+        matching_companies = index.rows(pos for pos, _score in hits[offset:])
     logging.info(f"Found {len(matching_companies)} companies matching query: {query}")
-    return matching_companies
+    return page_json(matching_companies, offset, limit, fields, max_bytes)
 
 @mcp.tool()
 def yc_advanced_search(industry: str = None, status: str = None, region: str = None, 
                        query: str = None, batch: str = None, 
-                       min_team_size: int = None) -> list[dict[str, Any]]:
+                       min_team_size: int = None, fields: list[str] | None = None,
+                       limit: int | None = None, offset: int = 0,
+                       max_bytes: int | None = None) -> str:
     """Advanced search for YC companies with multiple filters.
     
     Args:
@@ -261,98 +370,91 @@ def yc_advanced_search(industry: str = None, status: str = None, region: str = N
         query: Optional text search in name, description, or tags
         batch: Optional batch filter (e.g., "Summer 2015")
         min_team_size: Optional minimum team size filter
+        fields: Optional company fields to return (e.g., ["name", "one_liner"])
+        limit: Maximum number of companies to return (default 100)
+        offset: Companies to skip; pass the previous `next_offset` to continue
+        max_bytes: Optional cap on the size of the results (~4 bytes per token)
     """
     logging.info(f"Advanced search with filters: industry={industry}, status={status}, "
-                f"region={region}, query={query}, batch={batch}, min_team_size={min_team_size}")
-    
-    all_companies = []
-    batch_slugs = []
-    
+                f"region={region}, query={query}, batch={batch}, min_team_size={min_team_size}, "
+                f"limit={limit}, offset={offset}")
+    limit, offset = _window(limit, offset)
+
     # If batch is specified, only search in that batch
-    if batch:
-        batch_slug = batch.lower().replace(" ", "-")
-        if batch_slug in AVAILABLE_BATCHES:
-            batch_slugs = [batch_slug]
-        else:
-            logging.error(f"Invalid batch: {batch}")
-            return []
-    else:
-        batch_slugs = AVAILABLE_BATCHES
-    
-    # Collect all companies from relevant batches
-    for batch_slug in batch_slugs:
-        try:
-            human_name = batch_slug.replace("-", " ").title()
-            companies = get_yc_batch_companies(human_name)
-            all_companies.extend(companies)
-        except Exception as e:
-            logging.error(f"Error processing batch {human_name}: {str(e)}")
-    
-    # Apply filters
-    filtered_companies = all_companies
-    
-    # Industry filter
-    if industry:
-        filtered_companies = [
-            company for company in filtered_companies
-            if (industry.lower() in company.get("industry", "").lower() or
-                any(industry.lower() in ind.lower() for ind in company.get("industries", [])))
-        ]
-    
-    # Status filter
-    if status:
-        filtered_companies = [
-            company for company in filtered_companies
-            if status.lower() in company.get("status", "").lower()
-        ]
-    
-    # Region filter
-    if region:
-        filtered_companies = [
-            company for company in filtered_companies
-            if any(region.lower() in reg.lower() for reg in company.get("regions", []))
-        ]
-    
-    # Text search filter
+    if batch and batch not in get_yc_batch_index():
+        return _unknown_batch(batch)
+
+    if YC_QUERY_BACKEND == "sql":
+        filtered_companies = sql_query(industry=industry, status=status, region=region,
+                                       query=query, batch=batch, min_team_size=min_team_size,
+                                       limit=limit + 1, offset=offset)
+        return page_json(filtered_companies, offset, limit, fields, max_bytes)
+
+    index = get_yc_company_index()
+
+    # The planner drives from the most selective filter and stops once the
+    # page is full, unless results still have to be ranked by the text query
+    stop = offset + limit + 1
+    filters = dict(industry=industry, status=status, region=region, batch=batch,
+                   min_team_size=min_team_size)
     if query:
-        filtered_companies = [
-            company for company in filtered_companies
-            if (query.lower() in company.get("name", "").lower() or
-                query.lower() in company.get("one_liner", "").lower() or
-                query.lower() in company.get("long_description", "").lower() or
-                any(query.lower() in tag.lower() for tag in company.get("tags", [])))
-        ]
-    
-    # Team size filter
-    if min_team_size is not None:
-        filtered_companies = [
-            company for company in filtered_companies
-            if company.get("team_size", 0) >= min_team_size
-        ]
+        # Text search ranked by relevance, within the filtered set if there is one
+        filtered = bool(industry or status or region or batch) or min_team_size is not None
+        candidates = set(index.select(**filters)) if filtered else None
+        hits = index.text.search(query, limit=stop, candidates=candidates)
+        positions = [pos for pos, _score in hits]
+    else:
+        positions = index.select(**filters, limit=stop)
+    filtered_companies = index.rows(positions[offset:])
     
     logging.info(f"Found {len(filtered_companies)} companies matching all filters")
-    return filtered_companies
+    return page_json(filtered_companies, offset, limit, fields, max_bytes)
+
+@mcp.tool()
+def yc_stats(group_by: str = None) -> str:
+    """Return precomputed YC company counts.
+
+    Prefer this over fetching companies and counting them: the counts are
+    kept up to date with the data and come back instantly.
+    
+    Args:
+        group_by: Optional dimension: "batch" (with hiring ratio and team-size
+            distribution per batch), "industry", "status", "region" or
+            "team_size". Omit it for all of them.
+    """
+    logging.info(f"Fetching YC stats grouped by: {group_by or 'all dimensions'}")
+    stats = get_yc_stats()
+    try:
+        view = stats.view(group_by)
+    except ValueError as e:
+        return dumps({"error": str(e)}).decode()
+    return encode_payload(("mcp/stats", get_yc_snapshot().version, group_by),
+                          lambda: view).decode()
 
 @mcp.resource("mcp://yc/{batch}.json", mime_type="application/json")
-def yc_batch_json(batch: str) -> list[dict[str, Any]]:
+def yc_batch_json(batch: str) -> str:
     """Return company list for a YC batch.
 
     Args:
         batch: slug like ``summer-2015`` or ``winter-2016`` (case‑insensitive).
     Returns:
-        A JSON‑serialisable Python object (FastMCP will handle encoding).
+        The batch as JSON text, encoded once per snapshot version.
     """
-    human_name = batch.replace("-", " ").title()  # "summer-2015" → "Summer 2015"
-    logging.info("Fetching YC batch → %s", human_name)
-
     try:
-        companies = get_yc_batch_companies(human_name)
-        logging.info(f"Successfully retrieved {len(companies)} companies for {human_name}")
-        return companies
+        index = get_yc_batch_index()
     except Exception as e:
-        logging.error(f"Error retrieving companies for {human_name}: {str(e)}")
-        # Return empty list in case of error
-        return []
+        logging.error(f"Error loading YC batches: {str(e)}")
+        return "[]"
+    # unknown batches are a dict lookup away from being rejected
+    if batch not in index:
+        logging.error(f"Unknown YC batch → {batch}")
+        return "[]"
+
+    human_name = index.name(batch)
+    logging.info("Fetching YC batch → %s", human_name)
+    payload = _batch_json(human_name)
+    logging.info(f"Successfully retrieved {len(payload)} bytes for {human_name}")
+    return payload
 
 
 if __name__ == "__main__":